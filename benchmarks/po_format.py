@@ -0,0 +1,115 @@
+"""Compare the native PO reader/writer with polib on a synthetic text block.
+
+Usage:
+    python benchmarks/po_format.py --output po.json
+    python benchmarks/po_format.py --compare po.json --threshold 1.25
+"""
+
+import json
+import random
+import sys
+import tempfile
+from pathlib import Path
+from typing import Annotated
+
+import polib
+import typer
+
+from mgtools.dataclasses.po_entry import PoEntry
+from mgtools.mgscii import MGSCII_TABLE
+from mgtools.po import load_po_file, save_po_file
+from run import compare_results, measure
+from synthetic import TEXT_CODES
+
+app = typer.Typer(help="Benchmark reading and writing locale PO files.")
+
+
+def build_po_entries(rng: random.Random, entries_count: int) -> list[PoEntry]:
+    entries = []
+
+    for _ in range(entries_count):
+        # Mostly single lines, some long enough to be wrapped or spanning lines
+        text = "".join(
+            MGSCII_TABLE[rng.choice(TEXT_CODES)] for _ in range(rng.randint(4, 120))
+        )
+
+        if rng.random() < 0.1:
+            text += "\n" + text[: len(text) // 2]
+
+        entries.append(PoEntry(text, "", [str(rng.randrange(4))]))
+
+    return entries
+
+
+def save_with_polib(file_path: Path, entries: list[PoEntry]) -> None:
+    po = polib.POFile()
+
+    for entry in entries:
+        po.append(polib.POEntry(msgid=entry.msgid, msgstr="", flags=entry.flags))
+
+    po.save(str(file_path))
+
+
+@app.command()
+def main(
+    output: Annotated[
+        Path | None, typer.Option(dir_okay=False, help="Write results as JSON here.")
+    ] = None,
+    compare: Annotated[
+        Path | None,
+        typer.Option(
+            exists=True, dir_okay=False, help="Compare against earlier results."
+        ),
+    ] = None,
+    threshold: Annotated[
+        float,
+        typer.Option(min=1.0, help="Median slowdown ratio treated as a regression."),
+    ] = 1.25,
+    repeat: Annotated[int, typer.Option(min=1, help="Timed runs per benchmark.")] = 5,
+    entries_count: Annotated[
+        int, typer.Option("--entries", min=1, help="Entries in the text block.")
+    ] = 50000,
+):
+    entries = build_po_entries(random.Random(0), entries_count)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        native_path = Path(work_dir) / "native.po"
+        polib_path = Path(work_dir) / "polib.po"
+
+        results = {
+            "write.native": measure(lambda: save_po_file(native_path, entries), repeat),
+            "write.polib": measure(
+                lambda: save_with_polib(polib_path, entries), repeat
+            ),
+        }
+
+        if native_path.read_bytes() != polib_path.read_bytes():
+            typer.echo("Native writer output differs from polib.")
+            raise typer.Exit(code=1)
+
+        results["read.native"] = measure(lambda: load_po_file(native_path), repeat)
+        results["read.polib"] = measure(lambda: polib.pofile(str(polib_path)), repeat)
+
+    if output is not None:
+        report = {"python": sys.version, "entries": entries_count, "results": results}
+        output.write_text(json.dumps(report, indent=2))
+
+    if compare is not None:
+        baseline = json.loads(compare.read_text())["results"]
+
+        if compare_results(results, baseline, threshold):
+            raise typer.Exit(code=1)
+
+        return
+
+    for name, result in results.items():
+        typer.echo(f"{name:<24} {result['median'] * 1000:10.3f} ms")
+
+    for operation in ("write", "read"):
+        native_time = results[f"{operation}.native"]["median"]
+        speedup = results[f"{operation}.polib"]["median"] / native_time
+        typer.echo(f"{operation}: native is {speedup:.1f}x faster than polib")
+
+
+if __name__ == "__main__":
+    app()
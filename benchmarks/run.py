@@ -0,0 +1,212 @@
+"""Time the hot paths of MGTools on a synthetic resource.
+
+Usage:
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --compare results.json --threshold 1.25
+"""
+
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from io import BytesIO
+from pathlib import Path
+from typing import Annotated
+
+import typer
+from typer.testing import CliRunner
+
+from mgtools import app as mgtools_app
+from mgtools.enumerators.file_type import FileType
+from mgtools.enumerators.platform import Platform
+from mgtools.file import File
+from mgtools.readers.font import Font
+from mgtools.readers.locale import Locale
+from mgtools.resource import Resource
+from synthetic import build_resource
+
+app = typer.Typer(help="Benchmark MGTools on a synthetic resource.")
+
+
+def measure(func: Callable[[], object], repeat: int) -> dict[str, float | int]:
+    func()  # Warm up caches and lazy imports
+
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start_time)
+
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "repeat": repeat,
+    }
+
+
+def get_sample_indices(resource: Resource) -> dict[FileType, int]:
+    indices: dict[FileType, int] = {}
+
+    for index in range(resource.file_count):
+        indices.setdefault(resource.get_file_type(index), index)
+
+    return indices
+
+
+def decode_file(file: File) -> File:
+    # Readers decode lazily, force it so the decoding itself is timed
+    if isinstance(file, Font):
+        file.get_pages()
+    elif isinstance(file, Locale):
+        for block in file.get_text_blocks().values():
+            block.get_strings()
+
+    return file
+
+
+def encode_file(file: File) -> bytes:
+    # Plain writes pass untouched data through, force a real re-encode
+    stream = BytesIO()
+    file.write_to(stream, force_encode=True)
+    return stream.getvalue()
+
+
+def run_cli(*args: str) -> None:
+    result = CliRunner().invoke(mgtools_app, ["mg1", *args])
+
+    if result.exit_code != 0:
+        raise RuntimeError(f"mg1 {' '.join(args)} failed: {result.output}")
+
+
+def run_benchmarks(work_dir: Path, repeat: int) -> dict[str, dict[str, float | int]]:
+    resource_path = work_dir / "resource.bin"
+    resource_path.write_bytes(build_resource())
+
+    export_dir = work_dir / "export"
+    output_path = work_dir / "generated.bin"
+    platform_value = str(Platform.GOG_ENGLISH.value)
+
+    results = {
+        "resource.from_file": measure(
+            lambda: Resource.from_file(resource_path), repeat
+        ),
+    }
+
+    resource = Resource.from_file(resource_path)
+    resource.export_all(export_dir, separate_chars=True)
+
+    for file_type, index in get_sample_indices(resource).items():
+        name = file_type.name.lower()
+        file = resource.get_file(index)
+        file_class = type(file)
+        chunk_data = bytes(resource.get_chunk_data(index))
+        reader_dir = work_dir / name
+
+        results[f"{name}.from_stream"] = measure(
+            lambda: decode_file(file_class.from_stream(BytesIO(chunk_data))), repeat
+        )
+        results[f"{name}.from_buffer"] = measure(
+            lambda: decode_file(file_class.from_buffer(memoryview(chunk_data))),
+            repeat,
+        )
+        results[f"{name}.encode"] = measure(lambda: encode_file(file), repeat)
+        results[f"{name}.export"] = measure(
+            lambda: resource.export(reader_dir, index, separate_chars=True), repeat
+        )
+        results[f"{name}.from_file"] = measure(
+            lambda: resource.load_from_folder(export_dir, index), repeat
+        )
+
+    results["cli.export"] = measure(
+        lambda: run_cli(
+            "export", str(resource_path), str(work_dir / "cli"), "--separate-chars"
+        ),
+        repeat,
+    )
+    results["cli.generate"] = measure(
+        lambda: run_cli(
+            "generate",
+            str(export_dir),
+            str(output_path),
+            "--platform",
+            platform_value,
+            "--no-cache",
+        ),
+        repeat,
+    )
+
+    return results
+
+
+def compare_results(
+    results: dict[str, dict[str, float | int]],
+    baseline: dict[str, dict[str, float | int]],
+    threshold: float,
+) -> list[str]:
+    regressions = []
+
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+
+        ratio = result["median"] / baseline[name]["median"]
+        marker = ""
+
+        if ratio > threshold:
+            regressions.append(name)
+            marker = " REGRESSION"
+
+        typer.echo(
+            f"{name:<24} {result['median'] * 1000:10.3f} ms {ratio:6.2f}x{marker}"
+        )
+
+    return regressions
+
+
+@app.command()
+def main(
+    output: Annotated[
+        Path | None, typer.Option(dir_okay=False, help="Write results as JSON here.")
+    ] = None,
+    compare: Annotated[
+        Path | None,
+        typer.Option(
+            exists=True, dir_okay=False, help="Compare against earlier results."
+        ),
+    ] = None,
+    threshold: Annotated[
+        float,
+        typer.Option(min=1.0, help="Median slowdown ratio treated as a regression."),
+    ] = 1.25,
+    repeat: Annotated[int, typer.Option(min=1, help="Timed runs per benchmark.")] = 5,
+):
+    with tempfile.TemporaryDirectory() as work_dir:
+        results = run_benchmarks(Path(work_dir), repeat)
+
+    if output is not None:
+        report = {
+            "python": sys.version,
+            "machine": platform.platform(),
+            "results": results,
+        }
+        output.write_text(json.dumps(report, indent=2))
+
+    if compare is None:
+        for name, result in results.items():
+            typer.echo(f"{name:<24} {result['median'] * 1000:10.3f} ms")
+        return
+
+    baseline = json.loads(compare.read_text())["results"]
+    regressions = compare_results(results, baseline, threshold)
+
+    if regressions:
+        typer.echo(f"{len(regressions)} benchmarks slower than {threshold}x baseline.")
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
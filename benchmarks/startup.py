@@ -0,0 +1,98 @@
+"""Time CLI startup and check that heavy modules are not imported by it.
+
+Usage:
+    python benchmarks/startup.py --output startup.json
+    python benchmarks/startup.py --compare startup.json --threshold 1.25
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from run import compare_results, measure
+
+app = typer.Typer(help="Benchmark MGTools CLI startup.")
+
+# Only needed once a chunk of the matching type is decoded or encoded
+LAZY_MODULES = [
+    "PIL",
+    "polib",
+    "xml.etree.ElementTree",
+    "multiprocessing",
+    "cProfile",
+    "tracemalloc",
+    "mgtools.readers.font",
+    "mgtools.readers.locale",
+    "mgtools.readers.palette",
+    "mgtools.readers.sprite",
+]
+
+CLI_CODE = "from mgtools import app; app()"
+
+
+def run_python(*args: str) -> str:
+    return subprocess.run(
+        [sys.executable, *args], check=True, capture_output=True, text=True
+    ).stdout
+
+
+def get_eager_modules() -> list[str]:
+    loaded_modules = run_python(
+        "-c", "import sys, mgtools; print('\\n'.join(sys.modules))"
+    ).splitlines()
+    return [module for module in LAZY_MODULES if module in loaded_modules]
+
+
+@app.command()
+def main(
+    output: Annotated[
+        Path | None, typer.Option(dir_okay=False, help="Write results as JSON here.")
+    ] = None,
+    compare: Annotated[
+        Path | None,
+        typer.Option(
+            exists=True, dir_okay=False, help="Compare against earlier results."
+        ),
+    ] = None,
+    threshold: Annotated[
+        float,
+        typer.Option(min=1.0, help="Median slowdown ratio treated as a regression."),
+    ] = 1.25,
+    repeat: Annotated[int, typer.Option(min=1, help="Timed runs per benchmark.")] = 10,
+):
+    results = {
+        "python.startup": measure(lambda: run_python("-c", "pass"), repeat),
+        "import.mgtools": measure(lambda: run_python("-c", "import mgtools"), repeat),
+        "cli.help": measure(lambda: run_python("-c", CLI_CODE, "--help"), repeat),
+        "cli.mg1.help": measure(
+            lambda: run_python("-c", CLI_CODE, "mg1", "--help"), repeat
+        ),
+    }
+
+    eager_modules = get_eager_modules()
+
+    if output is not None:
+        report = {"python": sys.version, "results": results}
+        output.write_text(json.dumps(report, indent=2))
+
+    if compare is None:
+        for name, result in results.items():
+            typer.echo(f"{name:<24} {result['median'] * 1000:10.3f} ms")
+        regressions = []
+    else:
+        baseline = json.loads(compare.read_text())["results"]
+        regressions = compare_results(results, baseline, threshold)
+
+    if eager_modules:
+        typer.echo(f"Imported at startup: {', '.join(eager_modules)}")
+
+    if regressions or eager_modules:
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
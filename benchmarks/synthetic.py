@@ -0,0 +1,140 @@
+"""Synthetic, format-valid MG1 resources for benchmarking without game assets."""
+
+import random
+import struct
+
+from mgtools.enumerators.data_type import DataType
+from mgtools.enumerators.file_type import FileType
+from mgtools.enumerators.platform import Platform
+from mgtools.mg1.constants import (
+    FONT_GLYPH_COUNT,
+    FONT_GLYPH_HEIGHTS,
+    FONT_MINIMUM_PAGE_SIZE,
+    LOCALE_BLOCKS_COUNT,
+    RESOURCE_FILES_COUNT,
+    RESOURCE_MAGIC,
+)
+from mgtools.mg1.mappings import DATA_TYPE_MAP, FILE_TYPE_MAP, TEXT_BLOCKS
+from mgtools.mgscii import MGSCII_TABLE
+
+# Single byte MGSCII codes, the ones a translator would actually type
+TEXT_CODES = [code for code in MGSCII_TABLE if code < 256 and code != 10]
+
+
+def build_simple(payload: bytes) -> bytes:
+    return DataType.SIMPLE.to_bytes(2) + len(payload).to_bytes(2) + payload
+
+
+def build_sprite(rng: random.Random) -> bytes:
+    data = bytearray()
+
+    for _ in range(rng.choice([1, 1, 2, 4])):
+        width, height = rng.randint(8, 32), rng.randint(8, 32)
+        pixels = rng.randbytes(width * height)
+
+        data += (len(pixels) + 8).to_bytes(4)
+        data += struct.pack("<II", width, height)
+        data += pixels
+
+    data += (0).to_bytes(4)  # End of data marker
+    return build_simple(bytes(data))
+
+
+def build_palette(rng: random.Random) -> bytes:
+    colors = b"".join(rng.randbytes(3) + b"\0" for _ in range(256))
+    return build_simple(len(colors).to_bytes(4) + colors)
+
+
+def build_text_block(rng: random.Random, strings_count: int) -> bytes:
+    block = bytearray()
+
+    for _ in range(strings_count):
+        text = bytearray(rng.choice(TEXT_CODES) for _ in range(rng.randint(4, 48)))
+
+        if rng.random() < 0.05:
+            text += b"\x81\x63"  # Escaped ellipsis
+
+        block += rng.randrange(4).to_bytes(1)
+        block += len(text).to_bytes(2)
+        block += text
+
+    return bytes(block)
+
+
+def build_locale(rng: random.Random, strings_count: int = 80) -> bytes:
+    data = bytearray()
+
+    for idx in range(LOCALE_BLOCKS_COUNT):
+        if idx in TEXT_BLOCKS:
+            block = build_text_block(rng, strings_count)
+        else:
+            block = rng.randbytes(rng.randint(64, 512))
+
+        data += len(block).to_bytes(4) + block
+
+    return build_simple(bytes(data))
+
+
+def build_font(rng: random.Random) -> bytes:
+    data = bytearray(DataType.MG1_FONT.to_bytes(2) + b"\0\0")
+
+    for height in FONT_GLYPH_HEIGHTS:
+        glyphs_data = bytearray()
+        bitmap_data = bytearray()
+
+        for _ in range(FONT_GLYPH_COUNT):
+            width = rng.choice([1, 4, 8, 12]) if height < 100 else rng.choice([1, 8])
+
+            glyphs_data += len(bitmap_data).to_bytes(2, "little")
+            glyphs_data += (0 if width == 1 else (width - 1) << 4).to_bytes(2, "little")
+
+            if width != 1:
+                bitmap_data += rng.randbytes(width * height // 4)
+
+        page = glyphs_data + bitmap_data
+        page += b"\0" * (FONT_MINIMUM_PAGE_SIZE - len(page))
+        data += len(page).to_bytes(4) + page
+
+    return bytes(data)
+
+
+def build_unknown(rng: random.Random, data_type: DataType) -> bytes:
+    match data_type:
+        case DataType.WITH_COUNT:
+            data = bytearray(DataType.WITH_COUNT.to_bytes(2) + (4 * 2).to_bytes(2))
+
+            for _ in range(4):
+                entry = rng.randbytes(rng.randint(16, 256))
+                data += len(entry).to_bytes(4) + entry
+
+            return bytes(data + (0).to_bytes(4))
+        case DataType.MG1_TEXTURE:
+            data = bytearray(DataType.MG1_TEXTURE.to_bytes(2) + b"\0\0")
+
+            for _ in range(2):
+                entry = rng.randbytes(rng.randint(256, 4096))
+                data += len(entry).to_bytes(4) + entry
+
+            return bytes(data)
+        case _:
+            return build_simple(rng.randbytes(rng.randint(16, 1024)))
+
+
+def build_resource(seed: int = 0, platform: Platform = Platform.GOG_ENGLISH) -> bytes:
+    rng = random.Random(seed)
+    data = bytearray(RESOURCE_MAGIC + platform.value.to_bytes(2))
+
+    for idx in range(RESOURCE_FILES_COUNT):
+        match FILE_TYPE_MAP.get(idx, FileType.UNKNOWN):
+            case FileType.SPRITE:
+                data += build_sprite(rng)
+            case FileType.PALETTE:
+                data += build_palette(rng)
+            case FileType.LOCALE:
+                data += build_locale(rng)
+            case FileType.FONT:
+                data += build_font(rng)
+            case _:
+                data += build_unknown(rng, DATA_TYPE_MAP.get(idx, DataType.SIMPLE))
+
+    return bytes(data)
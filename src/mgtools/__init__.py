@@ -10,4 +10,7 @@ app.add_typer(
 
 
 if __name__ == "__main__":
+    import multiprocessing
+
+    multiprocessing.freeze_support()
     app()
@@ -0,0 +1,66 @@
+def pack_shelves(
+    widths: list[int], height: int, atlas_width: int
+) -> tuple[list[tuple[int, int]], int] | None:
+    # All rectangles share one height, so shelves are exact rows and best fit
+    # decreasing (widest first, into the row with the least room left) packs
+    # them tightly. Zero width rectangles are not placed and stay at 0, 0
+    positions = [(0, 0)] * len(widths)
+    shelves_used: list[int] = []
+
+    for position in sorted(range(len(widths)), key=lambda i: widths[i], reverse=True):
+        width = widths[position]
+
+        if width == 0:
+            continue
+
+        if width > atlas_width:
+            return None
+
+        best_shelf = None
+
+        for shelf, used_width in enumerate(shelves_used):
+            if used_width + width <= atlas_width and (
+                best_shelf is None or used_width > shelves_used[best_shelf]
+            ):
+                best_shelf = shelf
+
+        if best_shelf is None:
+            best_shelf = len(shelves_used)
+            shelves_used.append(0)
+
+        positions[position] = (shelves_used[best_shelf], best_shelf * height)
+        shelves_used[best_shelf] += width
+
+    return positions, len(shelves_used) * height
+
+
+def get_atlas_layout(
+    widths: list[int], height: int, min_size: int, max_size: int
+) -> tuple[tuple[int, int], list[tuple[int, int]]]:
+    # Smallest power of two atlas the shelves fit in, by area and then the most
+    # square one (wider before taller). Sizes must be powers of two themselves
+    min_exponent = min_size.bit_length() - 1
+    max_exponent = max_size.bit_length() - 1
+
+    for area_exponent in range(2 * min_exponent, 2 * max_exponent + 1):
+        width_exponents = [
+            width_exponent
+            for width_exponent in range(min_exponent, max_exponent + 1)
+            if min_exponent <= area_exponent - width_exponent <= max_exponent
+        ]
+        width_exponents.sort(
+            key=lambda width_exponent: (
+                abs(2 * width_exponent - area_exponent),
+                -width_exponent,
+            )
+        )
+
+        for width_exponent in width_exponents:
+            atlas_width = 1 << width_exponent
+            atlas_height = 1 << (area_exponent - width_exponent)
+            layout = pack_shelves(widths, height, atlas_width)
+
+            if layout is not None and layout[1] <= atlas_height:
+                return (atlas_width, atlas_height), layout[0]
+
+    raise ValueError(f"Glyphs do not fit into a {max_size}x{max_size} atlas.")
@@ -0,0 +1,106 @@
+# 2 bits per pixel bitmaps, four pixels per byte with the first one in the
+# highest bits. Every pixel position gets its own 256 entry table, so whole
+# bitmaps are converted with bytes.translate and extended slices instead of
+# per byte Python loops.
+
+PIXELS_PER_BYTE = 4
+LEVEL_SCALE = 255 // 0b11  # Spreads 2 bit levels over 0..255 for 8 bit images
+
+UNPACK_TABLES = [
+    bytes((byte >> shift) & 0b11 for byte in range(256)) for shift in (6, 4, 2, 0)
+]
+SCALED_UNPACK_TABLES = [
+    bytes(((byte >> shift) & 0b11) * LEVEL_SCALE for byte in range(256))
+    for shift in (6, 4, 2, 0)
+]
+PACK_TABLES = [
+    bytes((value & 0b11) << shift for value in range(256)) for shift in (6, 4, 2, 0)
+]
+
+
+def unpack_2bpp(
+    data: bytes | bytearray | memoryview, scaled: bool = False
+) -> bytearray:
+    data = bytes(data)
+    pixels = bytearray(len(data) * PIXELS_PER_BYTE)
+    tables = SCALED_UNPACK_TABLES if scaled else UNPACK_TABLES
+
+    for position, table in enumerate(tables):
+        pixels[position::PIXELS_PER_BYTE] = data.translate(table)
+
+    return pixels
+
+
+def pack_2bpp(pixels: bytes | bytearray | memoryview) -> bytes:
+    # Only the lowest 2 bits of every pixel are kept, which maps scaled levels
+    # back as well. Incomplete trailing groups of pixels are dropped
+    packed_length = len(pixels) // PIXELS_PER_BYTE
+    pixels = bytes(pixels[: packed_length * PIXELS_PER_BYTE])
+
+    if packed_length == 0:
+        return b""
+
+    # Shifted pixels never overlap, so OR-ing them as big integers merges
+    # all four positions of every byte at once
+    packed = 0
+    for position, table in enumerate(PACK_TABLES):
+        packed |= int.from_bytes(pixels[position::PIXELS_PER_BYTE].translate(table))
+
+    return packed.to_bytes(packed_length)
+
+
+def crop_pixels(
+    pixels: bytes | bytearray | memoryview,
+    size: tuple[int, int],
+    x: int,
+    y: int,
+    width: int,
+    height: int,
+) -> bytes:
+    # 8 bit pixels of a width x height area, like Image.crop the parts outside
+    # of the image are filled with zeros
+    image_width, image_height = size
+
+    if x + width <= image_width and y + height <= image_height:
+        # Glyphs are narrow, so gather whole columns with extended slices
+        area = bytearray(width * height)
+        start = y * image_width + x
+
+        for column in range(width):
+            area[column::width] = pixels[
+                start + column : start + column + height * image_width : image_width
+            ]
+
+        return bytes(area)
+
+    rows = []
+
+    for row in range(y, y + height):
+        if 0 <= row < image_height and x < image_width:
+            row_start = row * image_width
+            line = pixels[row_start + x : row_start + min(x + width, image_width)]
+        else:
+            line = b""
+
+        rows.append(bytes(line) + b"\0" * (width - len(line)))
+
+    return b"".join(rows)
+
+
+def paste_pixels(
+    image_pixels: bytearray,
+    image_width: int,
+    pixels: bytes | bytearray | memoryview,
+    x: int,
+    y: int,
+    width: int,
+    height: int,
+) -> None:
+    # Copies a width x height area into 8 bit image pixels, column by column
+    # like crop_pixels. The area has to lie within the image
+    start = y * image_width + x
+
+    for column in range(width):
+        image_pixels[
+            start + column : start + column + height * image_width : image_width
+        ] = pixels[column::width]
@@ -0,0 +1,101 @@
+import hashlib
+import logging
+import os
+from pathlib import Path
+
+from mgtools.constants import (
+    BUILD_CACHE_EXTENSION,
+    BUILD_CACHE_FOLDER_SUFFIX,
+    BUILD_CACHE_VERSION,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class BuildCache:
+
+    @property
+    def cache_dir(self) -> Path:
+        return self.__cache_dir
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.__cache_dir = cache_dir
+        self.__disabled = False
+
+    @staticmethod
+    def for_folder(input_dir: Path) -> BuildCache:
+        input_dir = input_dir.resolve()
+        return BuildCache(
+            input_dir.with_name(f".{input_dir.name}{BUILD_CACHE_FOLDER_SUFFIX}")
+        )
+
+    @staticmethod
+    def get_fingerprint(input_dir: Path, source_paths: list[Path], **kwargs) -> str:
+        fingerprint = hashlib.blake2b(digest_size=16)
+        # Build options change the encoded chunk as well
+        fingerprint.update(f"{BUILD_CACHE_VERSION}\0{sorted(kwargs.items())}".encode())
+
+        for source_path in source_paths:
+            try:
+                stat = source_path.stat()
+                state = f"{stat.st_size}:{stat.st_mtime_ns}"
+            except FileNotFoundError:
+                state = "missing"
+
+            relative_path = source_path.relative_to(input_dir).as_posix()
+            fingerprint.update(f"\0{relative_path}\0{state}".encode())
+
+        return fingerprint.hexdigest()
+
+    def __get_entry_path(self, file_index: int, fingerprint: str) -> Path:
+        return (
+            self.__cache_dir / f"{file_index:02d}.{fingerprint}.{BUILD_CACHE_EXTENSION}"
+        )
+
+    def __disable(self, error: OSError) -> None:
+        # The cache only saves time, builds go on without it
+        logger.warning("Build cache disabled, %s", error)
+        self.__disabled = True
+
+    def load(self, file_index: int, fingerprint: str) -> memoryview | None:
+        if self.__disabled:
+            return None
+
+        try:
+            with open(self.__get_entry_path(file_index, fingerprint), "rb") as f:
+                return memoryview(f.read())
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            self.__disable(e)
+            return None
+
+    def store(
+        self, file_index: int, fingerprint: str, data: bytes | memoryview
+    ) -> None:
+        if self.__disabled:
+            return
+
+        try:
+            self.__store(file_index, fingerprint, data)
+        except OSError as e:
+            self.__disable(e)
+
+    def __store(
+        self, file_index: int, fingerprint: str, data: bytes | memoryview
+    ) -> None:
+        self.__cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # Entries are named after their fingerprint, so drop outdated ones
+        for stale_path in self.__cache_dir.glob(
+            f"{file_index:02d}.*.{BUILD_CACHE_EXTENSION}"
+        ):
+            stale_path.unlink(missing_ok=True)
+
+        entry_path = self.__get_entry_path(file_index, fingerprint)
+        temp_path = entry_path.with_name(f"{entry_path.name}.tmp")
+
+        with open(temp_path, "wb") as f:
+            f.write(data)
+
+        os.replace(temp_path, entry_path)
@@ -0,0 +1,120 @@
+import hashlib
+from io import BufferedReader, BytesIO
+
+from mgtools.enumerators.data_type import DataType
+
+
+def get_entries_count(data_type: DataType) -> int:
+    match data_type:
+        case DataType.MG1_FONT:
+            return 5  # Figure out where this 5 comes from
+        case DataType.MG1_TEXTURE:
+            return 2  # Figure out where this 2 comes from
+        case _:
+            raise ValueError(f"Data type {data_type} has no fixed entries count.")
+
+
+def get_chunk_length(buffer: memoryview, offset: int = 0) -> int:
+    data_type = DataType(int.from_bytes(buffer[offset : offset + 2]))
+    position = offset + 2
+
+    match data_type:
+        case DataType.SIMPLE:
+            data_length = int.from_bytes(buffer[position : position + 2])
+            position += 2 + data_length
+        case DataType.WITH_COUNT:
+            entries_count = int.from_bytes(buffer[position : position + 2]) // 2
+            position += 2
+
+            for _ in range(entries_count):
+                entry_length = int.from_bytes(buffer[position : position + 4])
+                position += 4 + entry_length
+
+            position += 4  # Skip padding
+        case DataType.MG1_FONT | DataType.MG1_TEXTURE:
+            position += 2  # Skip identifier
+
+            for _ in range(get_entries_count(data_type)):
+                entry_length = int.from_bytes(buffer[position : position + 4])
+                position += 4 + entry_length
+        case _:
+            raise ValueError(f"Unknown data type: {data_type}")
+
+    if position > len(buffer):
+        raise ValueError(f"Chunk at offset {offset} is truncated.")
+
+    return position - offset
+
+
+def read_chunk(reader: BufferedReader | BytesIO) -> memoryview:
+    chunk = bytearray(reader.read(2))
+    data_type = DataType(int.from_bytes(chunk))
+
+    match data_type:
+        case DataType.SIMPLE:
+            chunk += reader.read(2)
+            chunk += reader.read(int.from_bytes(chunk[2:4]))
+        case DataType.WITH_COUNT:
+            chunk += reader.read(2)
+
+            for _ in range(int.from_bytes(chunk[2:4]) // 2):
+                entry_header = reader.read(4)
+                chunk += entry_header
+                chunk += reader.read(int.from_bytes(entry_header))
+
+            chunk += reader.read(4)  # Padding
+        case DataType.MG1_FONT | DataType.MG1_TEXTURE:
+            chunk += reader.read(2)  # Identifier
+
+            for _ in range(get_entries_count(data_type)):
+                entry_header = reader.read(4)
+                chunk += entry_header
+                chunk += reader.read(int.from_bytes(entry_header))
+        case _:
+            raise ValueError(f"Unknown data type: {data_type}")
+
+    return memoryview(chunk)
+
+
+# Stream for readers' write_to, hashes the output and compares it to the
+# expected chunk as it is written, so nothing is buffered
+class VerifyingWriter:
+
+    @property
+    def length(self) -> int:
+        return self.__position
+
+    def __init__(self, expected: bytes | memoryview) -> None:
+        self.__expected = memoryview(expected)
+        self.__hash = hashlib.blake2b()
+        self.__position = 0
+        self.__first_difference: int | None = None
+
+    def write(self, data: bytes | bytearray | memoryview) -> int:
+        data = memoryview(data)
+        self.__hash.update(data)
+
+        if self.__first_difference is None:
+            expected = self.__expected[self.__position : self.__position + len(data)]
+
+            if expected != data[: len(expected)] or len(expected) < len(data):
+                for i, (byte, expected_byte) in enumerate(zip(data, expected)):
+                    if byte != expected_byte:
+                        break
+                else:
+                    i = len(expected)
+
+                self.__first_difference = self.__position + i
+
+        self.__position += len(data)
+        return len(data)
+
+    def get_first_difference(self) -> int | None:
+        if self.__hash.digest() == hashlib.blake2b(self.__expected).digest():
+            return None
+
+        if self.__first_difference is not None:
+            return self.__first_difference
+
+        # Everything written matched, but the output ended early
+        return self.__position
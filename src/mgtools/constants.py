@@ -11,3 +11,12 @@ EXPORT_SPRITE_EXTENSION = "png"
 EXPORT_SPRITE_FOLDER = "sprites"
 EXPORT_UNKNOWN_EXTENSION = "bin"
 EXPORT_UNKNOWN_FOLDER = "raw"
+EXPORT_RESOURCE_METADATA_FILENAME = "resource.json"
+BUILD_CACHE_VERSION = 1
+BUILD_CACHE_EXTENSION = "bin"
+BUILD_CACHE_FOLDER_SUFFIX = ".cache"
+CHUNK_STORE_VERSION = 1
+CHUNK_STORE_OBJECTS_FOLDER = "objects"
+CHUNK_STORE_MANIFESTS_FOLDER = "manifests"
+CHUNK_STORE_MANIFEST_EXTENSION = "json"
+PO_WRAP_WIDTH = 78
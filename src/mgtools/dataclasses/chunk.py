@@ -0,0 +1,14 @@
+from dataclasses import dataclass, field
+
+from mgtools.enumerators.data_type import DataType
+from mgtools.enumerators.file_type import FileType
+
+
+@dataclass
+class Chunk:
+    index: int
+    offset: int
+    length: int
+    data_type: DataType
+    file_type: FileType = FileType.UNKNOWN
+    data: memoryview = field(default=memoryview(b""), repr=False, compare=False)
@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+
+from mgtools.enumerators.file_type import FileType
+
+
+@dataclass
+class ChunkStats:
+    index: int
+    file_type: FileType = FileType.UNKNOWN
+    # On export decoding reads the chunk and encoding writes exported files,
+    # on generate decoding reads source files and encoding produces the chunk
+    decode_time: float = 0.0
+    encode_time: float = 0.0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    peak_memory: int = 0
+    cached: bool = False
@@ -1,14 +1,80 @@
-from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
-from PIL import Image
+from mgtools.mgscii import get_mgscii_char
 
+if TYPE_CHECKING:
+    from PIL import Image
 
-@dataclass
+    from mgtools.dataclasses.glyph_table import GlyphTable
+
+
+# View of one glyph in a GlyphTable, reads and writes go to the table columns
 class Glyph:
-    index: int
-    char: str
-    offset: int
-    width: int
-    image: Image.Image | None = None
-    x_offset: int = 0
-    y_offset: int = 0
+
+    __slots__ = ("__table", "__position")
+
+    @property
+    def index(self) -> int:
+        return self.__table.indices[self.__position]
+
+    @property
+    def char(self) -> str:
+        return get_mgscii_char(self.index)
+
+    @property
+    def offset(self) -> int:
+        return self.__table.offsets[self.__position]
+
+    @property
+    def width(self) -> int:
+        return self.__table.widths[self.__position]
+
+    @property
+    def height(self) -> int:
+        return self.__table.height
+
+    @property
+    def x_offset(self) -> int:
+        return self.__table.x_offsets[self.__position]
+
+    @x_offset.setter
+    def x_offset(self, x_offset: int) -> None:
+        self.__table.x_offsets[self.__position] = x_offset
+
+    @property
+    def y_offset(self) -> int:
+        return self.__table.y_offsets[self.__position]
+
+    @y_offset.setter
+    def y_offset(self, y_offset: int) -> None:
+        self.__table.y_offsets[self.__position] = y_offset
+
+    @property
+    def pixels(self) -> bytes | memoryview | None:
+        return self.__table.get_pixels(self.__position)
+
+    @property
+    def image(self) -> Image.Image | None:
+        # The table keeps the image, edits made to it are encoded with the page
+        return self.__table.get_image(self.__position)
+
+    @image.setter
+    def image(self, image: Image.Image | None) -> None:
+        if image is None:
+            self.__table.set_pixels(self.__position, None)
+            return
+
+        if image.height != self.height:
+            raise ValueError(
+                f"Glyph image must be {self.height} pixels high, got {image.height}."
+            )
+
+        self.__table.widths[self.__position] = image.width
+        self.__table.set_pixels(self.__position, image.convert("L").tobytes())
+
+    def __init__(self, table: GlyphTable, position: int) -> None:
+        self.__table = table
+        self.__position = position
+
+    def __repr__(self) -> str:
+        return f"Glyph(index={self.index}, char={self.char!r}, offset={self.offset}, width={self.width})"
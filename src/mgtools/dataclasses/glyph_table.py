@@ -0,0 +1,82 @@
+from array import array
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from mgtools.bitmap import PIXELS_PER_BYTE
+from mgtools.dataclasses.glyph import Glyph
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+# One font page as columns, glyphs are views into them
+@dataclass(slots=True)
+class GlyphTable:
+    height: int
+    # Decoded page bitmap, 8 bit grey levels
+    bitmap: bytes | bytearray | memoryview = b""
+    indices: array = field(default_factory=lambda: array("H"))
+    offsets: array = field(default_factory=lambda: array("H"))
+    widths: array = field(default_factory=lambda: array("H"))
+    x_offsets: array = field(default_factory=lambda: array("H"))
+    y_offsets: array = field(default_factory=lambda: array("H"))
+    # Pixels of edited glyphs, they no longer come from the page bitmap
+    edited_pixels: dict[int, bytes | None] = field(default_factory=dict)
+    # Images handed out so far, they may be edited in place and get encoded again
+    images: dict[int, Image.Image] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, position: int) -> Glyph:
+        if not -len(self) <= position < len(self):
+            raise IndexError("Glyph position out of range.")
+
+        return Glyph(self, position % len(self))
+
+    def __iter__(self) -> Iterator[Glyph]:
+        for position in range(len(self)):
+            yield Glyph(self, position)
+
+    def get_pixels(self, position: int) -> bytes | memoryview | None:
+        if position in self.images:
+            return self.images[position].tobytes()
+
+        if position in self.edited_pixels:
+            return self.edited_pixels[position]
+
+        width = self.widths[position]
+
+        if width == 4096:
+            return None
+
+        pixels_start = self.offsets[position] * PIXELS_PER_BYTE
+        pixels_size = width * self.height
+        pixels = self.bitmap[pixels_start : pixels_start + pixels_size]
+
+        # Make sure the glyph has all its pixels, even past the page end
+        if len(pixels) < pixels_size:
+            pixels = bytes(pixels) + b"\0" * (pixels_size - len(pixels))
+
+        return pixels
+
+    def set_pixels(self, position: int, pixels: bytes | None) -> None:
+        self.images.pop(position, None)
+        self.edited_pixels[position] = pixels
+
+    def get_image(self, position: int) -> Image.Image | None:
+        if position not in self.images:
+            pixels = self.get_pixels(position)
+
+            if pixels is None:
+                return None
+
+            # PIL is only needed once a glyph is actually turned into an image
+            from PIL import Image
+
+            self.images[position] = Image.frombytes(
+                "L", (self.widths[position], self.height), bytes(pixels)
+            )
+
+        return self.images[position]
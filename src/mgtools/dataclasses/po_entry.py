@@ -0,0 +1,11 @@
+from dataclasses import dataclass, field
+
+
+# PO entry with only the fields mgtools exports, attributes match polib.POEntry
+@dataclass(slots=True)
+class PoEntry:
+    msgid: str = ""
+    msgstr: str = ""
+    flags: list[str] = field(default_factory=list)
+    tcomment: str = ""
+    comment: str = ""
@@ -0,0 +1,85 @@
+from array import array
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+
+import polib
+
+from mgtools.dataclasses.po_entry import PoEntry
+from mgtools.mgscii import read_mgscii_strings
+from mgtools.profiler import Profiler
+
+
+# One locale text block as flag/offset/length columns over the block data,
+# strings are decoded together on first use and become entries only when accessed
+@dataclass(slots=True)
+class TextBlock:
+    # Block records, up to the end of the last string
+    data: bytes | memoryview = b""
+    flags: array = field(default_factory=lambda: array("B"))
+    offsets: array = field(default_factory=lambda: array("I"))
+    lengths: array = field(default_factory=lambda: array("H"))
+    strings: list[str] | None = None
+    # Entries handed out so far, they may be edited and get encoded again
+    entries: dict[int, polib.POEntry] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, index: int) -> polib.POEntry:
+        if not -len(self) <= index < len(self):
+            raise IndexError("Text block entry index out of range.")
+
+        index %= len(self)
+
+        if index not in self.entries:
+            self.entries[index] = self.create_entry(index)
+
+        return self.entries[index]
+
+    def __iter__(self) -> Iterator[polib.POEntry]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def get_strings(self) -> list[str]:
+        if self.strings is None:
+            with Profiler.stage("decode"):
+                self.strings = read_mgscii_strings(
+                    self.data, self.offsets, self.lengths
+                )
+
+        return self.strings
+
+    def get_text(self, index: int) -> str:
+        if index in self.entries:
+            entry = self.entries[index]
+            return entry.msgstr or entry.msgid
+
+        return self.get_strings()[index]
+
+    def get_flags(self, index: int) -> list[str]:
+        if index in self.entries:
+            return self.entries[index].flags
+
+        return [str(self.flags[index])]
+
+    def get_record(self, index: int) -> bytes | memoryview:
+        offset = self.offsets[index]
+        return self.data[offset - 3 : offset + self.lengths[index]]
+
+    def create_entry(self, index: int) -> polib.POEntry:
+        return polib.POEntry(
+            msgid=self.get_strings()[index],
+            msgstr="",
+            flags=[str(self.flags[index])],
+        )
+
+    def get_po_entries(self) -> list[PoEntry | polib.POEntry]:
+        # Entries not handed out yet don't need to become polib entries
+        return [
+            (
+                self.entries[index]
+                if index in self.entries
+                else PoEntry(string, "", [str(self.flags[index])])
+            )
+            for index, string in enumerate(self.get_strings())
+        ]
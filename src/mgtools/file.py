@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
-from io import BufferedReader, BytesIO
+from io import BufferedReader, BufferedWriter, BytesIO
 from pathlib import Path
 
+from mgtools.chunk import get_chunk_length
 from mgtools.enumerators.data_type import DataType
 
 
@@ -12,12 +13,34 @@ class File(ABC):
         return self.__data_type
 
     @property
-    @abstractmethod
     def raw_data(self) -> bytes:
-        raise NotImplementedError()
+        # Encoded chunk as it would be written. Fonts and locales pass
+        # untouched pages and text blocks through, other readers encode again;
+        # use write_to(force_encode=True) to always encode
+        stream = BytesIO()
+        self.write_to(stream)
+        return stream.getvalue()
+
+    @property
+    def source_data(self) -> memoryview | None:
+        return self.__source_data
+
+    @property
+    def is_dirty(self) -> bool:
+        return self.__dirty or self.__source_data is None
 
     def __init__(self, data_type: DataType) -> None:
         self.__data_type: DataType = data_type
+        self.__source_data: memoryview | None = None
+        self.__dirty: bool = True
+
+    def set_source_data(self, buffer: memoryview) -> None:
+        # Encoded bytes this file was parsed from, written back as-is while clean
+        self.__source_data = buffer[: get_chunk_length(buffer)]
+        self.__dirty = False
+
+    def mark_dirty(self) -> None:
+        self.__dirty = True
 
     @staticmethod
     @abstractmethod
@@ -26,13 +49,39 @@ class File(ABC):
 
     @staticmethod
     @abstractmethod
-    def from_file(file_path: Path) -> File:
+    def from_buffer(buffer: memoryview) -> File:
+        raise NotImplementedError()
+
+    @staticmethod
+    @abstractmethod
+    def from_file(file_path: Path, **kwargs) -> File:
+        raise NotImplementedError()
+
+    @staticmethod
+    def get_source_paths(file_path: Path) -> list[Path]:
+        return [file_path]
+
+    @staticmethod
+    def get_import_options() -> tuple[str, ...]:
+        # Import options changing the chunk from_file builds for this file type
+        return ()
+
+    @staticmethod
+    def get_export_options() -> tuple[str, ...]:
+        # Export options changing what export writes for this file type
+        return ()
+
+    @abstractmethod
+    def write_to(self, stream: BufferedWriter | BytesIO, **kwargs) -> None:
         raise NotImplementedError()
 
     @abstractmethod
     def add_data(self, **kwargs) -> None:
         raise NotImplementedError()
 
+    def get_differences(self, other: File) -> list[str]:
+        return []
+
     @abstractmethod
     def export(self, output_path: Path, **kwargs) -> None:
         raise NotImplementedError()
@@ -1,12 +1,22 @@
+import glob
+import os
+import time
 from pathlib import Path
-from typing import Annotated
+from typing import TYPE_CHECKING, Annotated
 
 import typer
 
+from mgtools.cache import BuildCache
+from mgtools.enumerators.data_type import DataType
+from mgtools.enumerators.file_type import FileType
 from mgtools.enumerators.game import Game
 from mgtools.enumerators.platform import Platform
-from mgtools.mg1.constants import RESOURCE_FILES_COUNT
+from mgtools.readers import get_reader_class
 from mgtools.resource import Resource
+from mgtools.store import ChunkStore
+
+if TYPE_CHECKING:
+    from mgtools.profiler import Profiler
 
 app = typer.Typer(help="Tools for modding PC ports of Metal Gear")
 
@@ -25,14 +35,91 @@ def export(
         bool,
         typer.Option(help="Export font glyphs as separate images instead of an atlas."),
     ] = False,
+    jobs: Annotated[
+        int,
+        typer.Option(
+            "--jobs", "-j", min=1, help="Number of processes exporting chunks."
+        ),
+    ] = 1,
+    store: Annotated[
+        Path | None,
+        typer.Option(
+            file_okay=False,
+            writable=True,
+            help="Export into a content-addressed chunk store instead, identical chunks are stored once.",
+        ),
+    ] = None,
+    stats_json: Annotated[
+        Path | None,
+        typer.Option(
+            dir_okay=False,
+            writable=True,
+            help="Write per-chunk timings, sizes and peak memory as JSON (chunks are processed in this process).",
+        ),
+    ] = None,
+    profile: Annotated[
+        Path | None,
+        typer.Option(
+            file_okay=False,
+            writable=True,
+            help="Dump cProfile stats per reader class into this folder (chunks are processed in this process).",
+        ),
+    ] = None,
 ):
-    if output_dir is None:
-        output_dir = input_file.parent / input_file.stem
-
     resource = Resource.from_file(input_file)
+    resource.set_profiler(create_profiler(stats_json, profile))
 
-    for index in range(resource.file_count):
-        resource.export(output_dir, index, separate_chars=separate_chars)
+    if store is not None:
+        name = get_manifest_name(input_file, resource)
+        stored_count = resource.export_to_store(
+            ChunkStore(store), name, jobs=jobs, separate_chars=separate_chars
+        )
+
+        typer.echo(
+            f"Stored {stored_count} new chunks, reused {resource.file_count - stored_count} (manifest: {name})."
+        )
+    else:
+        if output_dir is None:
+            output_dir = input_file.parent / input_file.stem
+
+        resource.export_all(output_dir, jobs=jobs, separate_chars=separate_chars)
+
+    report_profile(resource.profiler, stats_json, profile)
+
+
+def create_profiler(stats_json: Path | None, profile: Path | None) -> Profiler | None:
+    if stats_json is None and profile is None:
+        return None
+
+    from mgtools.profiler import Profiler
+
+    return Profiler(profile_readers=profile is not None)
+
+
+def report_profile(
+    profiler: Profiler | None, stats_json: Path | None, profile: Path | None
+) -> None:
+    if profiler is None:
+        return
+
+    profiler.stop()
+
+    for file_type, total in profiler.get_totals().items():
+        typer.echo(
+            f"{file_type.name:<8} decode {total.decode_time:8.3f}s encode {total.encode_time:8.3f}s"
+            f" {total.bytes_in:>10} -> {total.bytes_out:>10} bytes"
+            f" peak {total.peak_memory / 1024:10.1f} KiB"
+        )
+
+    if stats_json is not None:
+        profiler.save_stats(stats_json)
+
+    if profile is not None:
+        profiler.dump_profiles(profile)
+
+
+def get_manifest_name(input_file: Path, resource: Resource) -> str:
+    return f"{input_file.stem}.{resource.platform.name}"
 
 
 @app.command(help="Generate new resource file from specified folder.")
@@ -42,19 +129,423 @@ def generate(
         Path | None, typer.Argument(file_okay=True, writable=True)
     ] = None,
     platform: Annotated[
-        Platform, typer.Option(..., help="Target platform")
-    ] = Platform.UNKNOWN,
+        Platform | None,
+        typer.Option(
+            ...,
+            help="Target platform (defaults to the one recorded by export in the input folder).",
+        ),
+    ] = None,
+    cache: Annotated[
+        bool,
+        typer.Option(
+            help="Reuse encoded chunks whose source files did not change since the last build (kept in a hidden folder next to the input folder)."
+        ),
+    ] = False,
+    jobs: Annotated[
+        int,
+        typer.Option(
+            "--jobs", "-j", min=1, help="Number of processes encoding chunks."
+        ),
+    ] = 1,
+    dedup_glyphs: Annotated[
+        bool,
+        typer.Option(
+            help="Store identical font glyph bitmaps once, glyphs share them."
+        ),
+    ] = False,
+    stats_json: Annotated[
+        Path | None,
+        typer.Option(
+            dir_okay=False,
+            writable=True,
+            help="Write per-chunk timings, sizes and peak memory as JSON (chunks are processed in this process).",
+        ),
+    ] = None,
+    profile: Annotated[
+        Path | None,
+        typer.Option(
+            file_okay=False,
+            writable=True,
+            help="Dump cProfile stats per reader class into this folder (chunks are processed in this process).",
+        ),
+    ] = None,
 ):
     if output_file is None:
         output_file = input_dir / f"{input_dir.name}.bin"
 
-    resource = Resource(game=Game.MG1, platform=platform)
-
-    for index in range(RESOURCE_FILES_COUNT):
-        resource.add_from_folder(input_dir, index)
+    if platform is None:
+        platform = Resource.load_platform(input_dir) or Platform.UNKNOWN
 
+    resource = Resource.from_folder(
+        input_dir,
+        game=Game.MG1,
+        platform=platform,
+        jobs=jobs,
+        cache=BuildCache.for_folder(input_dir) if cache else None,
+        profiler=create_profiler(stats_json, profile),
+        dedup_glyphs=dedup_glyphs,
+    )
     resource.save(output_file)
 
+    if dedup_glyphs:
+        report_shared_glyphs(resource, input_dir)
+
+    report_profile(resource.profiler, stats_json, profile)
+
+
+def report_shared_glyphs(resource: Resource, input_dir: Path) -> None:
+    font_class = get_reader_class(FileType.FONT)
+
+    for index in range(resource.file_count):
+        if resource.get_file_type(index) != FileType.FONT:
+            continue
+
+        font = resource.get_file(index)
+
+        # Fonts encoded by workers or taken from the cache are built again
+        if not isinstance(font, font_class) or not font.get_dedup_savings():
+            font = resource.load_from_folder(input_dir, index, dedup_glyphs=True)
+
+        if not isinstance(font, font_class):
+            continue
+
+        for page_index, (shared_glyphs, saved_bytes) in enumerate(
+            font.get_dedup_savings()
+        ):
+            typer.echo(
+                f"Font {index:02d} page {page_index}: {shared_glyphs} glyphs share bitmaps, {saved_bytes} bytes saved"
+            )
+
+
+@app.command(help="Recreate an export folder from a chunk store manifest.")
+def checkout(
+    store: Annotated[Path, typer.Argument(dir_okay=True, readable=True)],
+    name: Annotated[
+        str, typer.Argument(help="Manifest name printed by export --store.")
+    ],
+    output_dir: Annotated[Path, typer.Argument(file_okay=False, writable=True)],
+    link: Annotated[
+        bool,
+        typer.Option(
+            help="Hard link stored files instead of copying them (do not edit them then)."
+        ),
+    ] = False,
+):
+    ChunkStore(store).checkout(name, output_dir, link=link)
+
+
+@app.command(
+    help="Replace chunks of an existing resource file with files from specified folder."
+)
+def patch(
+    resource_file: Annotated[
+        Path, typer.Argument(exists=True, file_okay=True, readable=True)
+    ],
+    input_dir: Annotated[Path, typer.Argument(dir_okay=True, readable=True)],
+    indices: Annotated[
+        list[int],
+        typer.Option(
+            "--index", "-i", help="Index of the chunk to replace (repeatable)."
+        ),
+    ],
+    output_file: Annotated[
+        Path | None,
+        typer.Option(
+            file_okay=True, writable=True, help="Write patched resource here instead."
+        ),
+    ] = None,
+):
+    with Resource.from_file(resource_file) as resource:
+        invalid_indices = [
+            index for index in indices if not 0 <= index < resource.file_count
+        ]
+
+        if invalid_indices:
+            raise typer.BadParameter(
+                f"{', '.join(map(str, invalid_indices))} (resource has {resource.file_count} chunks).",
+                param_hint="'--index' / '-i'",
+            )
+
+        for index in indices:
+            resource.replace_chunk(index, resource.load_from_folder(input_dir, index))
+
+        resource.save(output_file or resource_file)
+
+
+@app.command(help="Show which chunks differ between two resource files.")
+def diff(
+    first_file: Annotated[
+        Path, typer.Argument(exists=True, file_okay=True, readable=True)
+    ],
+    second_file: Annotated[
+        Path, typer.Argument(exists=True, file_okay=True, readable=True)
+    ],
+    details: Annotated[
+        bool,
+        typer.Option(help="Decode differing chunks and list what changed inside them."),
+    ] = False,
+):
+    first_resource = Resource.from_file(first_file)
+    second_resource = Resource.from_file(second_file)
+
+    if first_resource.platform != second_resource.platform:
+        typer.echo(
+            f"Platform: {first_resource.platform.name} -> {second_resource.platform.name}"
+        )
+
+    changed_indices = first_resource.get_changed_chunks(second_resource)
+
+    for index in changed_indices:
+        if index >= first_resource.file_count or index >= second_resource.file_count:
+            typer.echo(f"{index:02d} only present in one of the files")
+            continue
+
+        first_data = first_resource.get_chunk_data(index)
+        second_data = second_resource.get_chunk_data(index)
+        first_type = DataType(int.from_bytes(first_data[0:2]))
+        second_type = DataType(int.from_bytes(second_data[0:2]))
+
+        data_type = first_type.name
+        if first_type != second_type:
+            data_type = f"{first_type.name} -> {second_type.name}"
+
+        typer.echo(
+            f"{index:02d} {first_resource.get_file_type(index).name} {data_type}"
+            f" ({len(first_data)} -> {len(second_data)} bytes)"
+        )
+
+        if details:
+            first_chunk_file = first_resource.get_file(index)
+            second_chunk_file = second_resource.get_file(index)
+
+            for difference in first_chunk_file.get_differences(second_chunk_file):
+                typer.echo(f"    {difference}")
+
+    typer.echo(
+        f"{len(changed_indices)} of {max(first_resource.file_count, second_resource.file_count)} chunks differ."
+    )
+
+    if changed_indices or first_resource.platform != second_resource.platform:
+        raise typer.Exit(code=1)
+
+
+@app.command(
+    help="Check that every chunk of a resource file is re-encoded to identical bytes."
+)
+def verify(
+    input_file: Annotated[
+        Path, typer.Argument(exists=True, file_okay=True, readable=True)
+    ],
+    indices: Annotated[
+        list[int] | None,
+        typer.Option(
+            "--index", "-i", help="Index of the chunk to verify (repeatable)."
+        ),
+    ] = None,
+    dedup_glyphs: Annotated[
+        bool,
+        typer.Option(
+            help="Re-encode fonts with shared glyph bitmaps, for files generated with --dedup-glyphs."
+        ),
+    ] = False,
+):
+    resource = Resource.from_file(input_file)
+    checked_indices = indices or list(range(resource.file_count))
+    mismatch_count = 0
+
+    for index in checked_indices:
+        first_difference = resource.verify_chunk(index, dedup_glyphs=dedup_glyphs)
+
+        if first_difference is None:
+            continue
+
+        mismatch_count += 1
+        typer.echo(
+            f"{index:02d} {resource.get_file_type(index).name} differs at offset {first_difference}"
+            f" ({len(resource.get_chunk_data(index))} bytes)"
+        )
+
+    typer.echo(
+        f"{len(checked_indices) - mismatch_count} of {len(checked_indices)} chunks round-trip."
+    )
+
+    if mismatch_count:
+        raise typer.Exit(code=1)
+
+
+def expand_inputs(inputs: list[str]) -> list[Path]:
+    paths: list[Path] = []
+
+    for pattern in inputs:
+        if glob.has_magic(pattern):
+            paths.extend(
+                Path(match) for match in sorted(glob.glob(pattern, recursive=True))
+            )
+        else:
+            paths.append(Path(pattern))
+
+    return paths
+
+
+def get_batch_output(input_path: Path, output_dir: Path | None, base_dir: Path) -> Path:
+    if output_dir is not None:
+        # Mirror the input folders, so inputs sharing a name get separate outputs
+        output_dir = output_dir / input_path.absolute().parent.relative_to(base_dir)
+
+    if input_path.is_dir():
+        return (output_dir or input_path) / f"{input_path.name}.bin"
+
+    return (output_dir or input_path.parent) / input_path.stem
+
+
+def claim_batch_output(
+    claimed_outputs: dict[Path | str, Path], output: Path | str, input_path: Path
+) -> None:
+    key = output.absolute() if isinstance(output, Path) else output
+
+    if key in claimed_outputs:
+        raise ValueError(f"Output {output} collides with {claimed_outputs[key]}")
+
+    claimed_outputs[key] = input_path
+
+
+@app.command(
+    help="Export resource files and generate resource files from folders in one run."
+)
+def batch(
+    inputs: Annotated[
+        list[str],
+        typer.Argument(
+            help="Resource files to export and folders to generate from (glob patterns allowed)."
+        ),
+    ],
+    output_dir: Annotated[
+        Path | None,
+        typer.Option(
+            file_okay=False, writable=True, help="Put all outputs into this folder."
+        ),
+    ] = None,
+    separate_chars: Annotated[
+        bool,
+        typer.Option(help="Export font glyphs as separate images instead of an atlas."),
+    ] = False,
+    platform: Annotated[
+        Platform | None,
+        typer.Option(
+            ...,
+            help="Target platform of generated resources whose folder doesn't record one (exported by older versions).",
+        ),
+    ] = None,
+    cache: Annotated[
+        bool,
+        typer.Option(
+            help="Reuse encoded chunks whose source files did not change since the last build (kept in a hidden folder next to the input folder)."
+        ),
+    ] = False,
+    jobs: Annotated[
+        int | None,
+        typer.Option(
+            "--jobs", "-j", min=1, help="Number of processes shared by all inputs."
+        ),
+    ] = None,
+    store: Annotated[
+        Path | None,
+        typer.Option(
+            file_okay=False,
+            writable=True,
+            help="Export files into a content-addressed chunk store, identical chunks are stored once.",
+        ),
+    ] = None,
+    dedup_glyphs: Annotated[
+        bool,
+        typer.Option(
+            help="Store identical font glyph bitmaps once, glyphs share them."
+        ),
+    ] = False,
+):
+    input_paths = expand_inputs(inputs)
+    results: list[tuple[Path, str, float, str | None]] = []
+
+    base_dir = Path(
+        os.path.commonpath([path.absolute().parent for path in input_paths] or ["."])
+    )
+    # Folders generated from can't be export outputs at the same time
+    claimed_outputs: dict[Path | str, Path] = {
+        path.absolute(): path for path in input_paths if path.is_dir()
+    }
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        for input_path in input_paths:
+            start_time = time.perf_counter()
+            action = "generate" if input_path.is_dir() else "export"
+
+            try:
+                if action == "generate":
+                    output_file = get_batch_output(input_path, output_dir, base_dir)
+                    claim_batch_output(claimed_outputs, output_file, input_path)
+
+                    input_platform = Resource.load_platform(input_path) or platform
+
+                    if input_platform is None:
+                        raise ValueError(
+                            "Platform unknown, export the resource again or pass --platform"
+                        )
+
+                    output_file.parent.mkdir(parents=True, exist_ok=True)
+
+                    resource = Resource.from_folder(
+                        input_path,
+                        game=Game.MG1,
+                        platform=input_platform,
+                        executor=executor,
+                        cache=BuildCache.for_folder(input_path) if cache else None,
+                        dedup_glyphs=dedup_glyphs,
+                    )
+                    resource.save(output_file)
+                elif store is not None:
+                    resource = Resource.from_file(input_path)
+                    name = get_manifest_name(input_path, resource)
+                    claim_batch_output(claimed_outputs, name, input_path)
+
+                    resource.export_to_store(
+                        ChunkStore(store),
+                        name,
+                        executor=executor,
+                        separate_chars=separate_chars,
+                    )
+                else:
+                    export_dir = get_batch_output(input_path, output_dir, base_dir)
+                    claim_batch_output(claimed_outputs, export_dir, input_path)
+
+                    resource = Resource.from_file(input_path)
+                    resource.export_all(
+                        export_dir, executor=executor, separate_chars=separate_chars
+                    )
+
+                error = None
+            except Exception as e:
+                error = str(e) or type(e).__name__
+
+            results.append(
+                (input_path, action, time.perf_counter() - start_time, error)
+            )
+
+    failed_count = sum(1 for *_, error in results if error is not None)
+
+    for input_path, action, elapsed, error in results:
+        status = "ok" if error is None else f"failed: {error}"
+        typer.echo(f"{action:<8} {input_path} ({elapsed:.2f}s) {status}")
+
+    typer.echo(
+        f"Processed {len(results)} inputs, {len(results) - failed_count} succeeded,"
+        f" {failed_count} failed, {sum(elapsed for _, _, elapsed, _ in results):.2f}s total."
+    )
+
+    if failed_count:
+        raise typer.Exit(code=1)
+
 
 if __name__ == "__main__":
     app()
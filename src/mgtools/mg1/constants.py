@@ -7,5 +7,5 @@ FONT_START_CHAR = 30
 FONT_GLYPH_COUNT = 226
 FONT_GLYPH_HEIGHTS = [24, 12, 17, 24, 112]
 FONT_MINIMUM_PAGE_SIZE = 20480
-FONT_EXPORT_ATLAS_WIDTH = 256
-FONT_EXPORT_ATLAS_HEIGHT = 256
+FONT_EXPORT_ATLAS_MIN_SIZE = 16
+FONT_EXPORT_ATLAS_MAX_SIZE = 4096
@@ -1,3 +1,7 @@
+import codecs
+from collections.abc import Iterable
+from functools import cache
+
 MGSCII_TABLE = {
     10: "\n",
     32: " ",
@@ -154,49 +158,270 @@ MGSCII_TABLE = {
 }
 
 SPECIAL_CHARS = {99: "…", 135: "∞"}
+SPECIAL_CHAR_ESCAPE = 0x81
+
+CODEC_NAME = "mgscii"
+# Error handler reproducing how the game tools always treated unknown characters:
+# "???" when decoding and "?" when encoding
+REPLACE_ERRORS = "mgscii-replace"
+TRUNCATED_ESCAPE_REASON = "truncated special character escape"
+
+# Tables are built once, strings are then converted by the C charmap codec
+DECODING_TABLE = "".join(MGSCII_TABLE.get(code, "\ufffe") for code in range(256))
+# Special characters are encoded as their escape sequences directly
+ENCODING_TABLE: dict[int, int | bytes] = {
+    ord(char): code for code, char in MGSCII_TABLE.items() if code <= 255
+}
+ENCODING_TABLE.update(
+    (ord(char), bytes((SPECIAL_CHAR_ESCAPE, code)))
+    for code, char in SPECIAL_CHARS.items()
+)
+# Every byte decodes to one character, escapes and unknown bytes to a marker
+# no MGSCII character uses, so a whole block can be decoded at once
+BLOCK_DECODING_TABLE = DECODING_TABLE.replace("\ufffe", "\0")
+SPECIAL_DECODING_TABLE = "".join(
+    SPECIAL_CHARS.get(code, "\ufffe") for code in range(256)
+)
+SPECIAL_ENCODING_MAP = {char: code for code, char in SPECIAL_CHARS.items()}
 
 
 def get_mgscii_char(code: int) -> str:
     return MGSCII_TABLE.get(code, "???")
 
 
-def read_mgscii_string(data: bytes) -> str:
-    return_str = ""
+def handle_decode_error(
+    errors: str, data: bytes | memoryview, start: int, end: int, reason: str
+) -> tuple[str, int]:
+    error = UnicodeDecodeError(CODEC_NAME, bytes(data), start, end, reason)
+    return codecs.lookup_error(errors)(error)
 
-    special_char_parsed = False
-    for byte in data:
-        if byte != 129 and not special_char_parsed:
-            return_str += get_mgscii_char(byte)
-        elif byte == 129 and not special_char_parsed:
-            special_char_parsed = True
-        elif special_char_parsed:
-            return_str += SPECIAL_CHARS.get(byte, "???")
-            special_char_parsed = False
 
-    return return_str
+def handle_encode_error(
+    errors: str, text: str, start: int, end: int, reason: str, encoding_table
+) -> tuple[bytes, int]:
+    error = UnicodeEncodeError(CODEC_NAME, text, start, end, reason)
+    replacement, position = codecs.lookup_error(errors)(error)
 
+    if isinstance(replacement, str):
+        try:
+            replacement, _ = codecs.charmap_encode(
+                replacement, "strict", encoding_table
+            )
+        except UnicodeEncodeError:
+            raise error from None
 
-def write_mgscii_string(
-    text: str, char_substition_map: dict[str, int] | None = None
-) -> bytes:
-    reverse_map = {v: k for k, v in MGSCII_TABLE.items()}
-    special_chars_map = {v: k for k, v in SPECIAL_CHARS.items()}
-    return_bytes = bytearray()
+    return replacement, position if position >= 0 else position + len(text)
+
+
+# The C charmap codec runs in strict mode, its errors are passed on to the
+# handler as MGSCII errors with positions in the whole input
+def decode_mgscii(
+    data: bytes | memoryview, errors: str = "strict", final: bool = True
+) -> tuple[str, int]:
+    data = bytes(data)
+    parts = []
+    position = 0
 
-    for char in text:
-        if char_substition_map and char in char_substition_map:
-            c = char_substition_map[char]
+    while position < len(data):
+        escape = data.find(SPECIAL_CHAR_ESCAPE, position)
+        end = len(data) if escape == -1 else escape
+
+        try:
+            parts.append(
+                codecs.charmap_decode(data[position:end], "strict", DECODING_TABLE)[0]
+            )
+            position = end
+        except UnicodeDecodeError as error:
+            parts.append(
+                codecs.charmap_decode(
+                    data[position : position + error.start], "strict", DECODING_TABLE
+                )[0]
+            )
+            text, position = handle_decode_error(
+                errors,
+                data,
+                position + error.start,
+                position + error.end,
+                error.reason,
+            )
+            parts.append(text)
+            continue
+
+        if position == len(data):
+            break
+
+        if position + 1 >= len(data):
+            if not final:
+                return "".join(parts), position
+
+            text, position = handle_decode_error(
+                errors, data, position, len(data), TRUNCATED_ESCAPE_REASON
+            )
+            parts.append(text)
+            continue
+
+        special_char = SPECIAL_DECODING_TABLE[data[position + 1]]
+
+        if special_char == "\ufffe":
+            text, position = handle_decode_error(
+                errors, data, position, position + 2, "undefined special character"
+            )
+            parts.append(text)
         else:
-            c = reverse_map.get(char)
+            parts.append(special_char)
+            position += 2
+
+    return "".join(parts), len(data)
+
+
+def encode_mgscii(
+    text: str, errors: str = "strict", encoding_table=ENCODING_TABLE
+) -> tuple[bytes, int]:
+    parts = []
+    position = 0
+
+    while position < len(text):
+        try:
+            parts.append(
+                codecs.charmap_encode(text[position:], "strict", encoding_table)[0]
+            )
+            break
+        except UnicodeEncodeError as error:
+            parts.append(
+                codecs.charmap_encode(
+                    text[position : position + error.start], "strict", encoding_table
+                )[0]
+            )
+            replacement, position = handle_encode_error(
+                errors,
+                text,
+                position + error.start,
+                position + error.end,
+                error.reason,
+                encoding_table,
+            )
+            parts.append(replacement)
+
+    return b"".join(parts), len(text)
+
+
+def replace_errors(error: UnicodeError) -> tuple[str | bytes, int]:
+    if isinstance(error, UnicodeDecodeError):
+        # Game strings ending with a lone escape byte were always read without it
+        if error.reason == TRUNCATED_ESCAPE_REASON:
+            return "", error.end
+
+        return "???", error.end
+
+    if isinstance(error, UnicodeEncodeError):
+        return b"?" * (error.end - error.start), error.end
+
+    raise error
+
+
+class Codec(codecs.Codec):
+
+    def encode(self, input: str, errors: str = "strict") -> tuple[bytes, int]:
+        return encode_mgscii(input, errors)
+
+    def decode(self, input: bytes, errors: str = "strict") -> tuple[str, int]:
+        return decode_mgscii(input, errors)
+
 
-        if c is None:
-            c = 63  # 63 is the code for '?'
+class IncrementalEncoder(codecs.IncrementalEncoder):
 
-        if c > 255:
-            if char in special_chars_map:
-                return_bytes.append(129)
-                return_bytes.append(special_chars_map[char])
+    def encode(self, input: str, final: bool = False) -> bytes:
+        return encode_mgscii(input, self.errors)[0]
+
+
+class IncrementalDecoder(codecs.BufferedIncrementalDecoder):
+
+    def _buffer_decode(self, input: bytes, errors: str, final: bool) -> tuple[str, int]:
+        return decode_mgscii(input, errors, final)
+
+
+class StreamWriter(Codec, codecs.StreamWriter):
+    pass
+
+
+class StreamReader(Codec, codecs.StreamReader):
+    pass
+
+
+def search_codec(name: str) -> codecs.CodecInfo | None:
+    if name != CODEC_NAME:
+        return None
+
+    return codecs.CodecInfo(
+        name=CODEC_NAME,
+        encode=Codec().encode,
+        decode=Codec().decode,
+        incrementalencoder=IncrementalEncoder,
+        incrementaldecoder=IncrementalDecoder,
+        streamwriter=StreamWriter,
+        streamreader=StreamReader,
+    )
+
+
+codecs.register(search_codec)
+codecs.register_error(REPLACE_ERRORS, replace_errors)
+
+
+@cache
+def get_substitution_table(
+    substitutions: frozenset[tuple[str, int]],
+) -> dict[int, int | bytes]:
+    encoding_table = ENCODING_TABLE.copy()
+
+    # Substitutions take precedence over the escapes, codes above a byte only
+    # stand for the special characters, other characters were always left out
+    for char, code in substitutions:
+        if code <= 255:
+            encoding_table[ord(char)] = code
+        elif char in SPECIAL_ENCODING_MAP:
+            encoding_table[ord(char)] = bytes(
+                (SPECIAL_CHAR_ESCAPE, SPECIAL_ENCODING_MAP[char])
+            )
         else:
-            return_bytes.append(c)
+            encoding_table[ord(char)] = b""
+
+    return encoding_table
+
+
+def read_mgscii_string(data: bytes | memoryview) -> str:
+    return decode_mgscii(data, REPLACE_ERRORS)[0]
+
+
+def write_mgscii_string(
+    text: str,
+    char_substition_map: dict[str, int] | None = None,
+    encoding_table: dict[int, int | bytes] | None = None,
+) -> bytes:
+    # Callers writing many strings pass the substitution table resolved once
+    if encoding_table is None:
+        encoding_table = ENCODING_TABLE
+
+        if char_substition_map:
+            encoding_table = get_substitution_table(
+                frozenset(char_substition_map.items())
+            )
+
+    return encode_mgscii(text, REPLACE_ERRORS, encoding_table)[0]
+
+
+def read_mgscii_strings(
+    data: bytes | memoryview, offsets: Iterable[int], lengths: Iterable[int]
+) -> list[str]:
+    block_text = codecs.charmap_decode(data, "strict", BLOCK_DECODING_TABLE)[0]
+    strings = []
+
+    for offset, length in zip(offsets, lengths):
+        string = block_text[offset : offset + length]
+
+        # Escapes and unknown bytes don't map one byte to one character
+        if "\0" in string:
+            string = read_mgscii_string(data[offset : offset + length])
+
+        strings.append(string)
 
-    return return_bytes
+    return strings
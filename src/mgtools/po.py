@@ -0,0 +1,284 @@
+import re
+import textwrap
+from collections.abc import Sequence
+from pathlib import Path
+
+import polib
+
+from mgtools.constants import PO_WRAP_WIDTH
+from mgtools.dataclasses.po_entry import PoEntry
+
+# Reads and writes the subset of the PO format mgtools exports (msgid, msgstr,
+# flags and comments) the same way polib does, but without its generic state
+# machine. Files or entries using anything else are left to polib.
+
+PO_HEADER = '#\nmsgid ""\nmsgstr ""\n'
+
+# Replaced one after another, str.translate is much slower for non-ASCII text
+ESCAPE_SEQUENCES = [
+    ("\\", "\\\\"),
+    ("\t", "\\t"),
+    ("\r", "\\r"),
+    ("\n", "\\n"),
+    ("\v", "\\v"),
+    ("\b", "\\b"),
+    ("\f", "\\f"),
+    ('"', '\\"'),
+]
+UNESCAPE_PATTERN = re.compile(r'\\(\\|n|t|r|v|b|f|")')
+UNESCAPE_MAP = {"n": "\n", "t": "\t", "r": "\r", "v": "\v", "b": "\b", "f": "\f"}
+UNESCAPED_QUOTE_PATTERN = re.compile(r'([^\\]|^)"')
+
+# Escaped text has no whitespace besides spaces left, so it isn't replaced
+FIELD_WRAPPER = textwrap.TextWrapper(
+    width=PO_WRAP_WIDTH - 2,
+    replace_whitespace=False,
+    drop_whitespace=False,
+    break_long_words=False,
+)
+
+
+def escape_po_string(text: str) -> str:
+    for char, escape_sequence in ESCAPE_SEQUENCES:
+        if char in text:
+            text = text.replace(char, escape_sequence)
+
+    return text
+
+
+def unescape_po_string(text: str) -> str:
+    if "\\" not in text:
+        return text
+
+    return UNESCAPE_PATTERN.sub(
+        lambda match: UNESCAPE_MAP.get(match.group(1), match.group(1)), text
+    )
+
+
+def is_supported_entry(entry: PoEntry | polib.POEntry) -> bool:
+    if isinstance(entry, PoEntry):
+        return True
+
+    return (
+        entry.msgctxt is None
+        and not entry.msgid_plural
+        and not entry.msgstr_plural
+        and not entry.occurrences
+        and not entry.obsolete
+        and entry.previous_msgctxt is None
+        and entry.previous_msgid is None
+        and entry.previous_msgid_plural is None
+    )
+
+
+def format_po_field(field_name: str, value: str) -> list[str]:
+    lines = value.splitlines(True)
+
+    if len(lines) > 1:
+        lines = ["", *lines]
+    else:
+        escaped_value = escape_po_string(value)
+        special_chars_count = len(escaped_value) - len(value)
+        max_length = PO_WRAP_WIDTH - len(field_name) - 3 + special_chars_count
+
+        if len(value) <= max_length:
+            return [f'{field_name} "{escaped_value}"']
+
+        lines = [
+            "",
+            *(unescape_po_string(line) for line in FIELD_WRAPPER.wrap(escaped_value)),
+        ]
+
+    first_line, *lines = lines
+
+    return [
+        f'{field_name} "{escape_po_string(first_line)}"',
+        *(f'"{escape_po_string(line)}"' for line in lines),
+    ]
+
+
+def format_po_comment(comment: str, prefix: str) -> list[str]:
+    lines = []
+
+    for line in comment.split("\n"):
+        if len(line) + len(prefix) > PO_WRAP_WIDTH:
+            lines += textwrap.wrap(
+                line,
+                PO_WRAP_WIDTH,
+                initial_indent=prefix,
+                subsequent_indent=prefix,
+                break_long_words=False,
+            )
+        else:
+            lines.append(f"{prefix}{line}")
+
+    return lines
+
+
+def format_po_entry(entry: PoEntry | polib.POEntry) -> str:
+    lines = []
+
+    if entry.tcomment:
+        lines += format_po_comment(entry.tcomment, "# ")
+
+    if entry.comment:
+        lines += format_po_comment(entry.comment, "#. ")
+
+    if entry.flags:
+        lines.append(f"#, {', '.join(entry.flags)}")
+
+    lines += format_po_field("msgid", entry.msgid)
+    lines += format_po_field("msgstr", entry.msgstr)
+    lines.append("")
+
+    return "\n".join(lines)
+
+
+def save_po_file(file_path: Path, entries: Sequence[PoEntry | polib.POEntry]) -> None:
+    if not all(is_supported_entry(entry) for entry in entries):
+        po = polib.POFile()
+
+        for entry in entries:
+            if isinstance(entry, PoEntry):
+                entry = polib.POEntry(
+                    msgid=entry.msgid,
+                    msgstr=entry.msgstr,
+                    flags=entry.flags,
+                    tcomment=entry.tcomment,
+                    comment=entry.comment,
+                )
+
+            po.append(entry)
+
+        po.save(str(file_path))
+        return
+
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(PO_HEADER)
+
+        for entry in entries:
+            f.write("\n")
+            f.write(format_po_entry(entry))
+
+
+def parse_po_string(value: str) -> str | None:
+    if value == '""':
+        return ""
+
+    if len(value) < 2 or value[0] != '"' or value[-1] != '"':
+        return None
+
+    value = value[1:-1]
+
+    if '"' in value and UNESCAPED_QUOTE_PATTERN.search(value):
+        return None
+
+    return unescape_po_string(value)
+
+
+# Follows polib's parser transitions for the supported lines, None means
+# the file needs polib (which also reports the syntax errors)
+def parse_po_entries(text: str) -> list[PoEntry] | None:
+    entries = []
+    entry = PoEntry()
+    state = "start"
+    last_line = ""
+
+    for line in text.removeprefix("\ufeff").split("\n"):
+        line = line.strip()
+
+        if not line:
+            continue
+
+        last_line = line
+
+        if line[0] == '"':
+            value = parse_po_string(line)
+
+            if value is None or state not in ("msgid", "msgstr"):
+                return None
+
+            if state == "msgid":
+                entry.msgid += value
+            else:
+                entry.msgstr += value
+        elif line.startswith("msgid "):
+            value = parse_po_string(line[6:].lstrip())
+
+            if value is None or state == "msgid":
+                return None
+
+            if state == "msgstr":
+                entries.append(entry)
+                entry = PoEntry()
+
+            entry.msgid = value
+            state = "msgid"
+        elif line.startswith("msgstr "):
+            value = parse_po_string(line[7:].lstrip())
+
+            if value is None or state not in ("msgid", "tcomment"):
+                return None
+
+            entry.msgstr = value
+            state = "msgstr"
+        elif line.startswith("#, "):
+            if state == "msgstr":
+                entries.append(entry)
+                entry = PoEntry()
+
+            entry.flags += [flag.strip() for flag in line[3:].split(",")]
+            state = "flags"
+        elif line == "#," or line == "#.":
+            continue
+        elif line == "#" or line.startswith(("# ", "##", "#. ")):
+            # Comments before the first entry are the file header
+            if state in ("start", "header") and not line.startswith("#. "):
+                state = "header"
+                continue
+
+            if state == "msgstr":
+                entries.append(entry)
+                entry = PoEntry()
+
+            if line.startswith("#. "):
+                if entry.comment != "":
+                    entry.comment += "\n"
+
+                entry.comment += line[3:]
+                state = "comment"
+            else:
+                if entry.tcomment != "":
+                    entry.tcomment += "\n"
+
+                entry.tcomment += line.lstrip("#").removeprefix(" ")
+                state = "tcomment"
+        else:
+            return None
+
+    if last_line and not last_line.startswith("#"):
+        entries.append(entry)
+
+    # The entry without msgid holds the metadata, polib picks between several
+    metadata_entries = [entry for entry in entries if entry.msgid == ""]
+
+    if len(metadata_entries) > 1:
+        return None
+
+    if metadata_entries:
+        entries.remove(metadata_entries[0])
+
+    return entries
+
+
+def load_po_file(file_path: Path) -> Sequence[PoEntry | polib.POEntry]:
+    text = file_path.read_text(encoding="utf-8")
+
+    # Other encodings are declared in the metadata, polib takes care of them
+    if "charset=" not in text:
+        entries = parse_po_entries(text)
+
+        if entries is not None:
+            return entries
+
+    return polib.pofile(str(file_path))
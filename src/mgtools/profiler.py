@@ -0,0 +1,158 @@
+import cProfile
+import json
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict
+from pathlib import Path
+
+from mgtools.dataclasses.chunk_stats import ChunkStats
+from mgtools.enumerators.file_type import FileType
+
+
+class Profiler:
+    # Profiler measuring a chunk right now, readers report their stages to it
+    __current: Profiler | None = None
+
+    @property
+    def stats(self) -> list[ChunkStats]:
+        return [self.__stats[index] for index in sorted(self.__stats)]
+
+    def __init__(self, profile_readers: bool = False) -> None:
+        self.__profile_readers = profile_readers
+        self.__stats: dict[int, ChunkStats] = {}
+        self.__profiles: dict[str, cProfile.Profile] = {}
+        self.__active = False
+        self.__owns_tracing = False
+        # Time spent inside the measured stage that belongs to other stages
+        self.__stage_times: dict[str, float] = {}
+        self.__in_stage = False
+
+    def get_stats(self, index: int, file_type: FileType) -> ChunkStats:
+        stats = self.__stats.get(index)
+
+        if stats is None:
+            stats = ChunkStats(index=index, file_type=file_type)
+            self.__stats[index] = stats
+
+        return stats
+
+    @contextmanager
+    def measure(
+        self, index: int, file_type: FileType, stage: str, reader_class: type
+    ) -> Iterator[ChunkStats]:
+        stats = self.get_stats(index, file_type)
+
+        # Nested stages (e.g. the palette decoded while exporting a sprite)
+        # are timed by the outer one only
+        if self.__active:
+            yield stats
+            return
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__owns_tracing = True
+
+        profile = None
+
+        if self.__profile_readers:
+            profile = self.__profiles.setdefault(
+                reader_class.__name__, cProfile.Profile()
+            )
+
+        tracemalloc.reset_peak()
+        start_memory, _ = tracemalloc.get_traced_memory()
+
+        self.__active = True
+        self.__stage_times = {}
+        Profiler.__current = self
+        if profile is not None:
+            profile.enable()
+
+        start_time = time.perf_counter()
+
+        try:
+            yield stats
+        finally:
+            elapsed = time.perf_counter() - start_time
+
+            if profile is not None:
+                profile.disable()
+            self.__active = False
+            Profiler.__current = None
+
+            _, peak_memory = tracemalloc.get_traced_memory()
+
+            self.__stage_times[stage] = (
+                self.__stage_times.get(stage, 0.0)
+                + elapsed
+                - sum(self.__stage_times.values())
+            )
+
+            for stage_name, stage_time in self.__stage_times.items():
+                setattr(
+                    stats,
+                    f"{stage_name}_time",
+                    getattr(stats, f"{stage_name}_time") + stage_time,
+                )
+
+            stats.peak_memory = max(stats.peak_memory, peak_memory - start_memory)
+
+    @staticmethod
+    @contextmanager
+    def stage(stage: str) -> Iterator[None]:
+        # Readers decode and encode lazily or while loading, the time is
+        # moved out of whatever stage is being measured into this one
+        profiler = Profiler.__current
+
+        if profiler is None or profiler.__in_stage:
+            yield
+            return
+
+        profiler.__in_stage = True
+        start_time = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            profiler.__in_stage = False
+            profiler.__stage_times[stage] = (
+                profiler.__stage_times.get(stage, 0.0)
+                + time.perf_counter()
+                - start_time
+            )
+
+    def stop(self) -> None:
+        if self.__owns_tracing:
+            tracemalloc.stop()
+            self.__owns_tracing = False
+
+    def get_totals(self) -> dict[FileType, ChunkStats]:
+        totals: dict[FileType, ChunkStats] = {}
+
+        for stats in self.__stats.values():
+            total = totals.setdefault(
+                stats.file_type, ChunkStats(index=-1, file_type=stats.file_type)
+            )
+            total.decode_time += stats.decode_time
+            total.encode_time += stats.encode_time
+            total.bytes_in += stats.bytes_in
+            total.bytes_out += stats.bytes_out
+            total.peak_memory = max(total.peak_memory, stats.peak_memory)
+
+        return totals
+
+    def save_stats(self, output_path: Path) -> None:
+        chunks = [
+            {**asdict(stats), "file_type": stats.file_type.name} for stats in self.stats
+        ]
+
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump({"chunks": chunks}, f, indent=4)
+
+    def dump_profiles(self, output_dir: Path) -> None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        for reader_name, profile in self.__profiles.items():
+            profile.dump_stats(output_dir / f"{reader_name}.prof")
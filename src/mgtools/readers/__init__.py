@@ -0,0 +1,27 @@
+import importlib
+from functools import cache
+from typing import TYPE_CHECKING
+
+from mgtools.enumerators.file_type import FileType
+
+if TYPE_CHECKING:
+    from mgtools.file import File
+
+# Readers pull in PIL, polib and ElementTree, so each module is imported only
+# once a chunk of its type is actually decoded or encoded. PyInstaller can't
+# see these imports, frozen builds collect them with --collect-submodules
+READER_CLASSES: dict[FileType, tuple[str, str]] = {
+    FileType.SPRITE: ("mgtools.readers.sprite", "Sprite"),
+    FileType.PALETTE: ("mgtools.readers.palette", "Palette"),
+    FileType.LOCALE: ("mgtools.readers.locale", "Locale"),
+    FileType.FONT: ("mgtools.readers.font", "Font"),
+    FileType.UNKNOWN: ("mgtools.readers.unknown", "UnknownFile"),
+}
+
+
+@cache
+def get_reader_class(file_type: FileType) -> type[File]:
+    module_name, class_name = READER_CLASSES.get(
+        file_type, READER_CLASSES[FileType.UNKNOWN]
+    )
+    return getattr(importlib.import_module(module_name), class_name)
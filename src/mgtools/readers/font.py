@@ -1,299 +1,364 @@
-import os
-import struct
+import sys
 import xml.etree.ElementTree as ET
-from io import BufferedReader, BytesIO
+from array import array
+from io import BufferedReader, BufferedWriter, BytesIO
 from pathlib import Path
 
 from PIL import Image
 
+from mgtools.atlas import get_atlas_layout
+from mgtools.bitmap import crop_pixels, pack_2bpp, paste_pixels, unpack_2bpp
+from mgtools.chunk import get_entries_count, read_chunk
 from mgtools.constants import EXPORT_FONT_ATLAS_EXTENSION, EXPORT_FONT_METADATA_FILENAME
-from mgtools.dataclasses.glyph import Glyph
+from mgtools.dataclasses.glyph_table import GlyphTable
 from mgtools.enumerators.data_type import DataType
 from mgtools.file import File
 from mgtools.mg1.constants import (
-    FONT_EXPORT_ATLAS_HEIGHT,
-    FONT_EXPORT_ATLAS_WIDTH,
+    FONT_EXPORT_ATLAS_MAX_SIZE,
+    FONT_EXPORT_ATLAS_MIN_SIZE,
     FONT_GLYPH_COUNT,
     FONT_GLYPH_HEIGHTS,
     FONT_MINIMUM_PAGE_SIZE,
     FONT_START_CHAR,
 )
-from mgtools.mgscii import get_mgscii_char
+from mgtools.profiler import Profiler
 
 
 class Font(File):
 
-    @property
-    def raw_data(self) -> bytes:
-        page_bytes = b""
-
-        for page in self.__pages:
-            glyphs_data = bytearray()
-            bitmap_data = bytearray()
-
-            for glyph in page:
-                glyphs_data.extend(glyph.offset.to_bytes(2, "little"))
-
-                if glyph.width == 1:
-                    glyphs_data.extend((0).to_bytes(2))
-                else:
-                    glyphs_data.extend(((glyph.width - 1) << 4).to_bytes(2, "little"))
-
-                if glyph.width != 1 and glyph.width != 4096 and glyph.image is not None:
-                    packed_bitmap_data = Font.__pack_bitmap_data(glyph.image.tobytes())
-                    bitmap_data.extend(packed_bitmap_data)
-
-            missing_bytes = FONT_MINIMUM_PAGE_SIZE - len(glyphs_data + bitmap_data)
-            bitmap_data.extend(b"\0" * missing_bytes)
-
-            page_bytes += (
-                len(glyphs_data + bitmap_data).to_bytes(4) + glyphs_data + bitmap_data
-            )
-
-        return (
-            self.data_type.value.to_bytes(2)
-            + b"\0\0"  # Identifier placeholder
-            + page_bytes
-        )
-
     def __init__(self, data_type: DataType) -> None:
         super().__init__(data_type)
-        self.__pages = []
+        # Packed pages are kept as read or built, glyphs are decoded from them
+        # on first use and replace them once handed out for editing
+        self.__page_data: list[bytes | memoryview] = []
+        self.__pages: list[GlyphTable] | None = None
+        self.__glyphs_edited = False
+        self.__dedup_glyphs = False
+        # Glyphs sharing a bitmap and page bytes saved, per page built with dedup
+        self.__dedup_savings: list[tuple[int, int]] = []
 
     @staticmethod
     def from_stream(
         reader: BufferedReader | BytesIO,
     ) -> Font:
-        data_type = DataType(int.from_bytes(reader.read(2)))
+        return Font.from_buffer(read_chunk(reader))
+
+    @staticmethod
+    def from_buffer(buffer: memoryview) -> Font:
+        data_type = DataType(int.from_bytes(buffer[0:2]))
 
         if data_type != DataType.MG1_FONT:
             raise ValueError("Font files must have MG1_FONT data type.")
 
-        reader.seek(2, os.SEEK_CUR)  # Skip identifier
+        position = 4  # Skip identifier
 
         f = Font(data_type=data_type)
 
-        for idx in range(5):
-            page_size = int.from_bytes(reader.read(4))
-            page_data = reader.read(page_size)
-            f.add_data(page_data=BytesIO(page_data), page_index=idx)
+        for idx in range(get_entries_count(data_type)):
+            page_size = int.from_bytes(buffer[position : position + 4])
+            position += 4
+            f.add_data(
+                page_data=buffer[position : position + page_size], page_index=idx
+            )
+            position += page_size
+
+        f.set_source_data(buffer)
 
         return f
 
     @staticmethod
-    def from_file(file_path: Path) -> File:
-        xmlroot = ET.parse(file_path / EXPORT_FONT_METADATA_FILENAME).getroot()
-        page_elements = xmlroot.findall("Page")
-        page_bytes = b""
+    def get_source_paths(file_path: Path) -> list[Path]:
+        source_paths = [file_path / EXPORT_FONT_METADATA_FILENAME]
 
-        for page_idx, page in enumerate(page_elements):
-            altas_path = file_path / f"{page_idx}.{EXPORT_FONT_ATLAS_EXTENSION}"
+        for page_idx in range(len(FONT_GLYPH_HEIGHTS)):
+            atlas_path = file_path / f"{page_idx}.{EXPORT_FONT_ATLAS_EXTENSION}"
 
-            glyphs_data = bytearray()
-            bitmap_data = bytearray()
-
-            if not altas_path.exists():
-                page_glyphs_path = file_path / f"{page_idx}"
+            if atlas_path.exists():
+                source_paths.append(atlas_path)
+            else:
+                source_paths.extend(sorted((file_path / f"{page_idx}").glob("*.png")))
 
-                for glyph_element in page.findall("Glyph"):
-                    glyph_image_path = (
-                        page_glyphs_path
-                        / f"{int(glyph_element.get('index', '')):03d}.png"
-                    )
+        return source_paths
 
-                    if not glyph_image_path.exists():
-                        width = int(glyph_element.get("width", "0"))
-                        glyph_bitmap_data = b""
-                    else:
-                        glyph_image = Image.open(glyph_image_path).convert("L")
-                        pixel_data = glyph_image.tobytes()
+    @staticmethod
+    def get_import_options() -> tuple[str, ...]:
+        return ("dedup_glyphs",)
 
-                        glyph_bitmap_data = Font.__pack_bitmap_data(pixel_data)
+    @staticmethod
+    def get_export_options() -> tuple[str, ...]:
+        return ("separate_chars",)
 
-                        width = glyph_image.width
+    @staticmethod
+    def from_file(file_path: Path, **kwargs) -> File:
+        xmlroot = ET.parse(file_path / EXPORT_FONT_METADATA_FILENAME).getroot()
 
-                    glyphs_data.extend(len(bitmap_data).to_bytes(2, "little"))
+        # Glyphs are packed straight into page data, nothing is decoded again
+        f = Font(data_type=DataType.MG1_FONT)
+        f.__dedup_glyphs = kwargs.get("dedup_glyphs", False)
 
-                    if width == 1:
-                        glyphs_data.extend((0).to_bytes(2))
-                    else:
-                        glyphs_data.extend(((width - 1) << 4).to_bytes(2, "little"))
+        for page_idx, page in enumerate(xmlroot.findall("Page")):
+            atlas_path = file_path / f"{page_idx}.{EXPORT_FONT_ATLAS_EXTENSION}"
 
-                    if width != 1 and width != 4096:
-                        bitmap_data.extend(glyph_bitmap_data)
+            if atlas_path.exists():
+                glyph_bitmaps = Font.__read_atlas_glyphs(atlas_path, page, page_idx)
             else:
-                atlas_image = Image.open(
-                    file_path / f"{page_idx}.{EXPORT_FONT_ATLAS_EXTENSION}"
-                ).convert("L")
-
-                for glyph_element in page.findall("Glyph"):
-                    width = int(glyph_element.get("width", "0"))
-
-                    x_offset = int(glyph_element.get("x_offset", "0"))
-                    y_offset = int(glyph_element.get("y_offset", "0"))
-
-                    glyph_image = atlas_image.crop(
-                        (
-                            x_offset,
-                            y_offset,
-                            x_offset + width,
-                            y_offset + FONT_GLYPH_HEIGHTS[page_idx],
-                        )
-                    )
+                glyph_bitmaps = Font.__read_glyph_images(
+                    file_path / f"{page_idx}", page
+                )
 
-                    pixel_data = glyph_image.tobytes()
-                    glyph_bitmap_data = Font.__pack_bitmap_data(pixel_data)
+            with Profiler.stage("encode"):
+                page_data, shared_glyphs, saved_bytes = Font.__build_page(
+                    glyph_bitmaps, f.__dedup_glyphs
+                )
 
-                    glyphs_data.extend(len(bitmap_data).to_bytes(2, "little"))
+            f.add_data(page_data=page_data, page_index=page_idx)
 
-                    if width == 1:
-                        glyphs_data.extend((0).to_bytes(2))
-                    else:
-                        glyphs_data.extend(((width - 1) << 4).to_bytes(2, "little"))
+            if f.__dedup_glyphs:
+                f.__dedup_savings.append((shared_glyphs, saved_bytes))
 
-                    if width != 1 and width != 4096:
-                        bitmap_data.extend(glyph_bitmap_data)
+        return f
 
-            page_bytes += (
-                len(glyphs_data + bitmap_data).to_bytes(4) + glyphs_data + bitmap_data
+    @staticmethod
+    def __read_glyph_images(
+        page_glyphs_path: Path, page: ET.Element
+    ) -> list[tuple[int, bytes]]:
+        glyph_bitmaps = []
+
+        for glyph_element in page.findall("Glyph"):
+            glyph_image_path = (
+                page_glyphs_path / f"{int(glyph_element.get('index', '')):03d}.png"
             )
 
-        return Font.from_stream(
-            BytesIO(DataType.MG1_FONT.value.to_bytes(2) + b"\0\0" + page_bytes)
-        )
-
-    def add_data(self, **kwargs) -> None:
-        if "page_data" not in kwargs:
-            raise ValueError("Missing 'page_data' argument.")
+            if not glyph_image_path.exists():
+                width = int(glyph_element.get("width", "0"))
+                glyph_bitmap_data = b""
+            else:
+                glyph_image = Image.open(glyph_image_path).convert("L")
+                glyph_bitmap_data = pack_2bpp(glyph_image.tobytes())
+                width = glyph_image.width
 
-        page_index = kwargs.get("page_index", len(self.__pages))
+            glyph_bitmaps.append((width, glyph_bitmap_data))
 
-        reader = kwargs["page_data"]
-        glyphs: list[Glyph] = []
+        return glyph_bitmaps
 
-        for i in range(FONT_GLYPH_COUNT):
-            offset, metrics = struct.unpack("<HH", reader.read(4))
-            glyphs.append(
-                Glyph(
-                    char=get_mgscii_char(FONT_START_CHAR + i),
-                    index=FONT_START_CHAR + i,
-                    offset=offset,
-                    width=(metrics >> 4) + 1,
+    @staticmethod
+    def __read_atlas_glyphs(
+        atlas_path: Path, page: ET.Element, page_idx: int
+    ) -> list[tuple[int, bytes]]:
+        atlas_image = Image.open(atlas_path).convert("L")
+        atlas_pixels = atlas_image.tobytes()
+        height = FONT_GLYPH_HEIGHTS[page_idx]
+        glyph_bitmaps = []
+
+        for glyph_element in page.findall("Glyph"):
+            width = int(glyph_element.get("width", "0"))
+            glyph_bitmap_data = b""
+
+            if width != 1 and width != 4096:
+                pixel_data = crop_pixels(
+                    atlas_pixels,
+                    atlas_image.size,
+                    int(glyph_element.get("x_offset", "0")),
+                    int(glyph_element.get("y_offset", "0")),
+                    width,
+                    height,
                 )
-            )
+                glyph_bitmap_data = pack_2bpp(pixel_data)
 
-        bitmap_data_offset_start = reader.tell()
+            glyph_bitmaps.append((width, glyph_bitmap_data))
 
-        for glyph in glyphs:
-            reader.seek(bitmap_data_offset_start + glyph.offset, os.SEEK_SET)
-            bitmap_size = glyph.width * FONT_GLYPH_HEIGHTS[page_index]
+        return glyph_bitmaps
 
-            if glyph.width == 4096:
-                continue
+    @staticmethod
+    def __build_page(
+        glyph_bitmaps: list[tuple[int, bytes]], dedup_glyphs: bool = False
+    ) -> tuple[bytes, int, int]:
+        glyphs_data = bytearray()
+        bitmap_data = bytearray()
+        shared_offsets: dict[bytes, int] = {}
+        shared_glyphs = 0
+        shared_bytes = 0
+
+        for width, glyph_bitmap_data in glyph_bitmaps:
+            offset = len(bitmap_data)
+
+            if width != 1 and width != 4096:
+                if dedup_glyphs and glyph_bitmap_data in shared_offsets:
+                    # Identical bitmaps are stored once, glyphs share the offset
+                    offset = shared_offsets[glyph_bitmap_data]
+                    shared_glyphs += 1
+                    shared_bytes += len(glyph_bitmap_data)
+                else:
+                    if glyph_bitmap_data:
+                        shared_offsets[glyph_bitmap_data] = offset
 
-            unpacked_bitmap_data = self.__unpack_bitmap_data(
-                glyph,
-                reader.read(bitmap_size),
-                FONT_GLYPH_HEIGHTS[page_index],
-            )
+                    bitmap_data.extend(glyph_bitmap_data)
 
-            # Make sure the unpacked data length matches expected size
-            if len(unpacked_bitmap_data) < glyph.width * FONT_GLYPH_HEIGHTS[page_index]:
-                unpacked_bitmap_data += b"\0" * (
-                    glyph.width * FONT_GLYPH_HEIGHTS[page_index]
-                    - len(unpacked_bitmap_data)
+            if offset > 0xFFFF:
+                raise ValueError(
+                    "Font page bitmap exceeds 16-bit glyph offsets, try deduplicating glyphs."
                 )
 
-            image = Image.frombytes(
-                "L",
-                (glyph.width, FONT_GLYPH_HEIGHTS[page_index]),
-                bytes(unpacked_bitmap_data),
-                "raw",
-            )
-
-            glyph.image = image.point(lambda i: i * (255 // 3))
+            glyphs_data.extend(offset.to_bytes(2, "little"))
 
-        self.__pages.append(glyphs)
-
-    @staticmethod
-    def __unpack_bitmap_data(glyph: Glyph, pixel_data: bytes, height: int) -> bytes:
-        unpacked_bitmap_data = bytearray()
+            if width == 1:
+                glyphs_data.extend((0).to_bytes(2))
+            else:
+                glyphs_data.extend(((width - 1) << 4).to_bytes(2, "little"))
 
-        for byte in pixel_data:
-            p1 = (byte >> 6) & 0b11
-            p2 = (byte >> 4) & 0b11
-            p3 = (byte >> 2) & 0b11
-            p4 = byte & 0b11
+        page_size = len(glyphs_data) + len(bitmap_data)
+        bitmap_data.extend(b"\0" * (FONT_MINIMUM_PAGE_SIZE - page_size))
 
-            unpacked_bitmap_data.append(p1)
-            unpacked_bitmap_data.append(p2)
-            unpacked_bitmap_data.append(p3)
-            unpacked_bitmap_data.append(p4)
+        # Pages are padded to the minimum size, shared bytes may not shrink them
+        saved_bytes = max(page_size + shared_bytes, FONT_MINIMUM_PAGE_SIZE) - max(
+            page_size, FONT_MINIMUM_PAGE_SIZE
+        )
 
-        return unpacked_bitmap_data
+        return bytes(glyphs_data + bitmap_data), shared_glyphs, saved_bytes
 
-    @staticmethod
-    def __pack_bitmap_data(pixel_bytes: bytes) -> bytes:
-        packed_bitmap_data = bytearray()
+    def add_data(self, **kwargs) -> None:
+        self.mark_dirty()
 
-        try:
-            for i in range(0, len(pixel_bytes), 4):
-                p1 = pixel_bytes[i] & 0b11
-                p2 = pixel_bytes[i + 1] & 0b11
-                p3 = pixel_bytes[i + 2] & 0b11
-                p4 = pixel_bytes[i + 3] & 0b11
+        if "page_data" not in kwargs:
+            raise ValueError("Missing 'page_data' argument.")
 
-                packed_byte = (p1 << 6) | (p2 << 4) | (p3 << 2) | p4
-                packed_bitmap_data.append(packed_byte)
-        except IndexError:
-            pass
+        self.__page_data.append(kwargs["page_data"])
 
-        return bytes(packed_bitmap_data)
+        if self.__pages is not None:
+            self.__pages.append(
+                Font.__decode_page(kwargs["page_data"], len(self.__page_data) - 1)
+            )
 
-    def __generate_atlas(self, output_path: Path, page_index: int) -> None:
-        glyphs = self.__pages[page_index]
-        atlas_image = Image.new(
-            "L", (FONT_EXPORT_ATLAS_WIDTH, FONT_EXPORT_ATLAS_HEIGHT)
+    @staticmethod
+    def __decode_page(page_data: bytes | memoryview, page_index: int) -> GlyphTable:
+        # Offsets and metrics interleaved, as little endian 16-bit values
+        glyph_entries = array("H")
+        glyph_entries.frombytes(page_data[: FONT_GLYPH_COUNT * 4])
+
+        if sys.byteorder == "big":
+            glyph_entries.byteswap()
+
+        glyph_count = len(glyph_entries) // 2
+
+        # Decode the whole page bitmap at once, glyphs are views into it
+        return GlyphTable(
+            height=FONT_GLYPH_HEIGHTS[page_index],
+            bitmap=memoryview(
+                unpack_2bpp(page_data[FONT_GLYPH_COUNT * 4 :], scaled=True)
+            ),
+            indices=array("H", range(FONT_START_CHAR, FONT_START_CHAR + glyph_count)),
+            offsets=glyph_entries[0::2],
+            widths=array("H", [(metrics >> 4) + 1 for metrics in glyph_entries[1::2]]),
+            x_offsets=array("H", bytes(glyph_count * 2)),
+            y_offsets=array("H", bytes(glyph_count * 2)),
         )
 
-        x_offset = 0
-        y_offset = 0
+    def __get_pages(self) -> list[GlyphTable]:
+        if self.__pages is None:
+            with Profiler.stage("decode"):
+                self.__pages = [
+                    Font.__decode_page(page_data, page_index)
+                    for page_index, page_data in enumerate(self.__page_data)
+                ]
+
+        return self.__pages
+
+    def get_pages(self) -> list[GlyphTable]:
+        # Glyphs are handed out as-is and may be edited, so they get encoded again
+        self.mark_dirty()
+        self.__glyphs_edited = True
+
+        return self.__get_pages()
+
+    def __get_pages_data(
+        self, force_encode: bool = False, dedup_glyphs: bool = False
+    ) -> list[bytes | memoryview]:
+        # Untouched pages are written as they were read, unless a real
+        # re-encode is asked for (e.g. to verify the bitmap codec)
+        if not self.__glyphs_edited and not force_encode:
+            return self.__page_data
+
+        return [
+            Font.__build_page(
+                [
+                    (
+                        glyph.width,
+                        b"" if glyph.pixels is None else pack_2bpp(glyph.pixels),
+                    )
+                    for glyph in glyphs
+                ],
+                dedup_glyphs,
+            )[0]
+            for glyphs in self.__get_pages()
+        ]
+
+    def get_dedup_savings(self) -> list[tuple[int, int]]:
+        # Only known for fonts built from exported files with dedup_glyphs
+        return list(self.__dedup_savings)
+
+    def write_to(self, stream: BufferedWriter | BytesIO, **kwargs) -> None:
+        stream.write(self.data_type.value.to_bytes(2))
+        stream.write(b"\0\0")  # Identifier placeholder
+
+        for page_data in self.__get_pages_data(
+            kwargs.get("force_encode", False),
+            kwargs.get("dedup_glyphs", self.__dedup_glyphs),
+        ):
+            stream.write(len(page_data).to_bytes(4))
+            stream.write(page_data)
 
-        for glyph in glyphs:
-            if glyph.image is None:
-                continue
+    def __generate_atlas(self, output_path: Path, page_index: int) -> None:
+        glyphs = self.__get_pages()[page_index]
+        height = FONT_GLYPH_HEIGHTS[page_index]
 
-            if x_offset + glyph.width > FONT_EXPORT_ATLAS_WIDTH:
-                x_offset = 0
-                y_offset += FONT_GLYPH_HEIGHTS[page_index]
+        # Width 1 glyphs and glyphs without bitmap are not read back on import
+        widths = [
+            0 if glyph.width == 1 or glyph.pixels is None else glyph.width
+            for glyph in glyphs
+        ]
 
-            atlas_image.paste(glyph.image, (x_offset, y_offset))
+        (atlas_width, atlas_height), positions = get_atlas_layout(
+            widths, height, FONT_EXPORT_ATLAS_MIN_SIZE, FONT_EXPORT_ATLAS_MAX_SIZE
+        )
+        atlas_pixels = bytearray(atlas_width * atlas_height)
 
+        for glyph, width, (x_offset, y_offset) in zip(glyphs, widths, positions):
             glyph.x_offset = x_offset
             glyph.y_offset = y_offset
 
-            if glyph.width == 1:
-                continue
-
-            x_offset += glyph.width
+            if width != 0:
+                paste_pixels(
+                    atlas_pixels,
+                    atlas_width,
+                    glyph.pixels,
+                    x_offset,
+                    y_offset,
+                    width,
+                    height,
+                )
 
-        atlas_image.save(output_path)
+        Image.frombytes("L", (atlas_width, atlas_height), bytes(atlas_pixels)).save(
+            output_path
+        )
 
     def __generate_glyph_images(self, output_path: Path, page_index: int) -> None:
-        glyphs = self.__pages[page_index]
+        glyphs = self.__get_pages()[page_index]
         output_path.mkdir(parents=True, exist_ok=True)
 
         for glyph in glyphs:
-            if glyph.image is None:
+            if glyph.pixels is None:
                 continue
 
+            # Not glyph.image, the table would keep every exported image
             glyph_image_path = output_path / f"{glyph.index:03d}.png"
-            glyph.image.save(glyph_image_path)
+            Image.frombytes("L", (glyph.width, glyph.height), bytes(glyph.pixels)).save(
+                glyph_image_path
+            )
 
     def __generate_metadata(self, output_path: Path) -> None:
         root = ET.Element("Font")
 
-        for page_index, glyphs in enumerate(self.__pages):
+        for page_index, glyphs in enumerate(self.__get_pages()):
             page_element = ET.SubElement(root, "Page", index=str(page_index))
 
             for glyph in glyphs:
@@ -315,8 +380,41 @@ class Font(File):
             xml_declaration=True,
         )
 
+    def get_differences(self, other: File) -> list[str]:
+        if not isinstance(other, Font):
+            return [f"File type changed to {type(other).__name__}"]
+
+        differences = []
+
+        pages = self.__get_pages()
+        other_pages = other.__get_pages()
+
+        if len(pages) != len(other_pages):
+            differences.append(f"Pages count: {len(pages)} -> {len(other_pages)}")
+
+        for page_index, (glyphs, other_glyphs) in enumerate(zip(pages, other_pages)):
+            for glyph, other_glyph in zip(glyphs, other_glyphs):
+                name = f"Page {page_index} glyph {glyph.index} ({glyph.char!r})"
+
+                if glyph.width != other_glyph.width:
+                    differences.append(
+                        f"{name} width: {glyph.width} -> {other_glyph.width}"
+                    )
+                elif glyph.width == 1:
+                    # Width 1 glyphs have no bitmap, their pixels are whatever
+                    # page bytes their offset happens to point at
+                    continue
+                elif (glyph.pixels is None) != (other_glyph.pixels is None) or (
+                    glyph.pixels is not None
+                    and other_glyph.pixels is not None
+                    and bytes(glyph.pixels) != bytes(other_glyph.pixels)
+                ):
+                    differences.append(f"{name} bitmap changed")
+
+        return differences
+
     def export(self, output_path: Path, **kwargs) -> None:
-        for page_index in range(len(self.__pages)):
+        for page_index in range(len(self.__page_data)):
             if kwargs.get("separate_chars", False):
                 self.__generate_glyph_images(
                     output_path / f"{page_index}",
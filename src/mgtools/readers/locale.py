@@ -1,73 +1,85 @@
 import json
-from io import BufferedReader, BytesIO
+import struct
+from array import array
+from io import BufferedReader, BufferedWriter, BytesIO
 from pathlib import Path
 
 import polib
 
+from mgtools.chunk import read_chunk
 from mgtools.constants import (
     EXPORT_LOCALE_CHAR_SUBSTITION_MAP_FILENAME,
     EXPORT_LOCALE_SCRIPTS_FOLDER,
 )
+from mgtools.dataclasses.po_entry import PoEntry
+from mgtools.dataclasses.text_block import TextBlock
 from mgtools.enumerators.data_type import DataType
 from mgtools.file import File
 from mgtools.mg1.constants import LOCALE_BLOCKS_COUNT
 from mgtools.mg1.mappings import TEXT_BLOCKS
-from mgtools.mgscii import read_mgscii_string, write_mgscii_string
+from mgtools.mgscii import get_substitution_table, write_mgscii_string
+from mgtools.po import load_po_file, save_po_file
+from mgtools.profiler import Profiler
 
 
 class Locale(File):
 
-    @property
-    def raw_data(self) -> bytes:
-        file_bytes = b""
-
-        for block_idx, block_data in self.__blocks.items():
-            if block_idx in TEXT_BLOCKS and isinstance(block_data, polib.POFile):
-                block_bytes = self.__build_text_block(block_data)
-            elif isinstance(block_data, bytes):
-                block_bytes = block_data
-            else:
-                raise ValueError(f"Invalid block data type for block {block_idx}.")
-
-            file_bytes += len(block_bytes).to_bytes(4) + block_bytes
-
-        return (
-            self.data_type.value.to_bytes(2) + len(file_bytes).to_bytes(2) + file_bytes
-        )
-
     def __init__(self, data_type: DataType) -> None:
         super().__init__(data_type)
-        self.__blocks: dict[int, bytes | polib.POFile] = {}
+        self.__blocks: dict[int, bytes | memoryview | TextBlock] = {}
 
     @staticmethod
     def from_stream(
         reader: BufferedReader | BytesIO,
     ) -> Locale:
-        data_type = DataType(int.from_bytes(reader.read(2)))
+        return Locale.from_buffer(read_chunk(reader))
+
+    @staticmethod
+    def from_buffer(buffer: memoryview) -> Locale:
+        data_type = DataType(int.from_bytes(buffer[0:2]))
 
         if data_type != DataType.SIMPLE:
             raise ValueError("Locale files must have SIMPLE data type.")
 
-        data_length = int.from_bytes(reader.read(2))
-        data = BytesIO(reader.read(data_length))
+        data_length = int.from_bytes(buffer[2:4])
+        data = buffer[4 : 4 + data_length]
 
         f = Locale(data_type=data_type)
 
         index = 0
-        while True:
-            block_size = int.from_bytes(data.read(4))
+        position = 0
+        while position + 4 <= len(data):
+            block_size = int.from_bytes(data[position : position + 4])
 
             if block_size == 0:
                 break
 
-            f.add_data(block_data=data.read(block_size), index=index)
+            position += 4
+            f.add_data(block_data=data[position : position + block_size], index=index)
+            position += block_size
             index += 1
 
+        f.set_source_data(buffer)
+
         return f
 
     @staticmethod
-    def from_file(file_path: Path) -> File:
-        locale_bytes = b""
+    def get_source_paths(file_path: Path) -> list[Path]:
+        source_paths = [file_path.parent / EXPORT_LOCALE_CHAR_SUBSTITION_MAP_FILENAME]
+
+        for idx in range(LOCALE_BLOCKS_COUNT):
+            if idx not in TEXT_BLOCKS:
+                source_paths.append(
+                    file_path / EXPORT_LOCALE_SCRIPTS_FOLDER / f"{idx:02d}.bin"
+                )
+            else:
+                source_paths.append(file_path / f"{idx:02d}.po")
+
+        return source_paths
+
+    @staticmethod
+    def from_file(file_path: Path, **kwargs) -> File:
+        locale_bytes = bytearray()
 
         # Load char substitution map if exists
         char_substition_map_path = (
@@ -80,6 +92,8 @@ class Locale(File):
             with open(char_substition_map_path, "r", encoding="utf-8") as f:
                 char_substition_map = json.load(f)
 
+        encoding_table = get_substitution_table(frozenset(char_substition_map.items()))
+
         for idx in range(LOCALE_BLOCKS_COUNT):
             if idx not in TEXT_BLOCKS:
                 block_path = file_path / EXPORT_LOCALE_SCRIPTS_FOLDER / f"{idx:02d}.bin"
@@ -87,75 +101,109 @@ class Locale(File):
                 with open(block_path, "rb") as block_file:
                     block_data = block_file.read()
 
-                locale_bytes += len(block_data).to_bytes(4) + block_data
+                locale_bytes += len(block_data).to_bytes(4)
+                locale_bytes += block_data
             else:
                 block_path = file_path / f"{idx:02d}.po"
-                po = polib.pofile(str(block_path))
+                po = load_po_file(block_path)
 
                 block_stream = BytesIO()
 
-                for entry in po:
-                    string_flag = int(entry.flags[0]) if entry.flags else 0
-                    string_unicode = entry.msgstr or entry.msgid
+                with Profiler.stage("encode"):
+                    for entry in po:
+                        string_flag = int(entry.flags[0]) if entry.flags else 0
+                        string_unicode = entry.msgstr or entry.msgid
 
-                    string_data = write_mgscii_string(
-                        string_unicode, char_substition_map
-                    )
-                    string_length = len(string_data)
+                        string_data = write_mgscii_string(
+                            string_unicode, encoding_table=encoding_table
+                        )
+                        string_length = len(string_data)
 
-                    block_stream.write(string_flag.to_bytes(1))
-                    block_stream.write(string_length.to_bytes(2))
-                    block_stream.write(string_data)
+                        block_stream.write(string_flag.to_bytes(1))
+                        block_stream.write(string_length.to_bytes(2))
+                        block_stream.write(string_data)
 
                 block_data = block_stream.getvalue()
-                locale_bytes += len(block_data).to_bytes(4) + block_data
+                locale_bytes += len(block_data).to_bytes(4)
+                locale_bytes += block_data
 
-        chunk_data = BytesIO(
+        chunk_data = memoryview(
             DataType.SIMPLE.value.to_bytes(2)
             + len(locale_bytes).to_bytes(2)
             + locale_bytes
         )
 
-        return Locale.from_stream(chunk_data)
+        return Locale.from_buffer(chunk_data)
 
-    def __parse_text_block(self, block_data: bytes) -> polib.POFile:
-        po = polib.POFile()
-        block_stream = BytesIO(block_data)
+    def __parse_text_block(self, block_data: bytes | memoryview) -> TextBlock:
+        flags = array("B")
+        offsets = array("I")
+        lengths = array("H")
+        position = 0
 
-        while True:
-            string_flag = int.from_bytes(block_stream.read(1))
-            string_length = int.from_bytes(block_stream.read(2))
+        while position + 3 <= len(block_data):
+            string_flag, string_length = struct.unpack_from(">BH", block_data, position)
 
             if string_length == 0:
                 break
 
-            string_data = read_mgscii_string(block_stream.read(string_length))
+            position += 3
+            flags.append(string_flag)
+            offsets.append(position)
+            lengths.append(string_length)
+            position += string_length
 
-            po.append(
-                polib.POEntry(
-                    msgid=string_data,
-                    msgstr="",
-                    flags=[str(string_flag)],
+        return TextBlock(block_data[:position], flags, offsets, lengths)
+
+    def __build_text_block(
+        self, block: TextBlock, force_encode: bool = False
+    ) -> bytes | memoryview:
+        # Untouched blocks are written as they were read, unless a real
+        # re-encode is asked for (e.g. to verify the MGSCII codec)
+        if not block.entries and not force_encode:
+            return block.data
+
+        block_stream = BytesIO()
+
+        for index in range(len(block)):
+            if index in block.entries:
+                self.__write_entry(block_stream, block.entries[index])
+            elif force_encode:
+                self.__write_string(
+                    block_stream, block.flags[index], block.get_strings()[index]
                 )
-            )
+            else:
+                block_stream.write(block.get_record(index))
+
+        return block_stream.getvalue()
+
+    def __write_entry(
+        self, block_stream: BytesIO, entry: PoEntry | polib.POEntry
+    ) -> None:
+        string_flag = int(entry.flags[0]) if entry.flags else 0
+        self.__write_string(block_stream, string_flag, entry.msgstr or entry.msgid)
 
-        return po
+    def __write_string(
+        self, block_stream: BytesIO, string_flag: int, text: str
+    ) -> None:
+        string_data = write_mgscii_string(text)
+        string_length = len(string_data)
 
-    def __build_text_block(self, po: polib.POFile) -> bytes:
+        block_stream.write(string_flag.to_bytes(1))
+        block_stream.write(string_length.to_bytes(2))
+        block_stream.write(string_data)
+
+    def __encode_po_file(self, po: polib.POFile) -> bytes:
         block_stream = BytesIO()
 
         for entry in po:
-            string_flag = int(entry.flags[0]) if entry.flags else 0
-            string_data = write_mgscii_string(entry.msgstr or entry.msgid)
-            string_length = len(string_data)
-
-            block_stream.write(string_flag.to_bytes(1))
-            block_stream.write(string_length.to_bytes(2))
-            block_stream.write(string_data)
+            self.__write_entry(block_stream, entry)
 
         return block_stream.getvalue()
 
     def add_data(self, **kwargs) -> None:
+        self.mark_dirty()
+
         if "block_data" not in kwargs:
             raise ValueError("Missing 'block_data' argument.")
 
@@ -168,13 +216,103 @@ class Locale(File):
 
         self.__blocks[index] = block_data
 
+    def get_text_blocks(self) -> dict[int, TextBlock]:
+        # Entries are handed out as-is and may be edited, so they get encoded again
+        self.mark_dirty()
+        return {
+            block_idx: block_data
+            for block_idx, block_data in self.__blocks.items()
+            if isinstance(block_data, TextBlock)
+        }
+
+    def get_script_blocks(self) -> dict[int, bytes]:
+        return {
+            block_idx: bytes(block_data)
+            for block_idx, block_data in self.__blocks.items()
+            if isinstance(block_data, bytes | memoryview)
+        }
+
+    def set_block(
+        self, index: int, block_data: bytes | TextBlock | polib.POFile
+    ) -> None:
+        self.mark_dirty()
+
+        if isinstance(block_data, polib.POFile):
+            block_data = self.__parse_text_block(self.__encode_po_file(block_data))
+
+        self.__blocks[index] = block_data
+
+    def write_to(self, stream: BufferedWriter | BytesIO, **kwargs) -> None:
+        blocks_bytes: list[bytes | memoryview] = []
+
+        for block_idx, block_data in self.__blocks.items():
+            if block_idx in TEXT_BLOCKS and isinstance(block_data, TextBlock):
+                blocks_bytes.append(
+                    self.__build_text_block(
+                        block_data, kwargs.get("force_encode", False)
+                    )
+                )
+            elif isinstance(block_data, bytes | memoryview):
+                blocks_bytes.append(block_data)
+            else:
+                raise ValueError(f"Invalid block data type for block {block_idx}.")
+
+        data_length = sum(len(block_bytes) + 4 for block_bytes in blocks_bytes)
+
+        stream.write(self.data_type.value.to_bytes(2))
+        stream.write(data_length.to_bytes(2))
+
+        for block_bytes in blocks_bytes:
+            stream.write(len(block_bytes).to_bytes(4))
+            stream.write(block_bytes)
+
+    def get_differences(self, other: File) -> list[str]:
+        if not isinstance(other, Locale):
+            return [f"File type changed to {type(other).__name__}"]
+
+        differences = []
+
+        for block_idx in sorted(self.__blocks.keys() | other.__blocks.keys()):
+            block_data = self.__blocks.get(block_idx)
+            other_block_data = other.__blocks.get(block_idx)
+
+            if block_data is None or other_block_data is None:
+                state = "added" if block_data is None else "removed"
+                differences.append(f"Block {block_idx:02d} {state}")
+            elif isinstance(block_data, TextBlock) and isinstance(
+                other_block_data, TextBlock
+            ):
+                if len(block_data) != len(other_block_data):
+                    differences.append(
+                        f"Block {block_idx:02d} entries count: {len(block_data)} -> {len(other_block_data)}"
+                    )
+
+                for i in range(min(len(block_data), len(other_block_data))):
+                    text = block_data.get_text(i)
+                    other_text = other_block_data.get_text(i)
+                    flags = block_data.get_flags(i)
+                    other_flags = other_block_data.get_flags(i)
+
+                    if text != other_text or flags != other_flags:
+                        differences.append(
+                            f"Block {block_idx:02d} entry {i}: {text!r} -> {other_text!r}"
+                        )
+            elif bytes(block_data) != bytes(other_block_data):
+                differences.append(
+                    f"Block {block_idx:02d} changed ({len(block_data)} -> {len(other_block_data)} bytes)"
+                )
+
+        return differences
+
     def export(self, output_path: Path, **kwargs) -> None:
         scripts_dir = output_path / EXPORT_LOCALE_SCRIPTS_FOLDER
         scripts_dir.mkdir(parents=True, exist_ok=True)
 
         for block_idx, block_data in self.__blocks.items():
-            if block_idx in TEXT_BLOCKS and isinstance(block_data, polib.POFile):
-                block_data.save(str(output_path / f"{block_idx:02d}.po"))
-            elif isinstance(block_data, bytes):
+            if block_idx in TEXT_BLOCKS and isinstance(block_data, TextBlock):
+                save_po_file(
+                    output_path / f"{block_idx:02d}.po", block_data.get_po_entries()
+                )
+            elif isinstance(block_data, bytes | memoryview):
                 with open(scripts_dir / f"{block_idx:02d}.bin", "wb") as f:
                     f.write(block_data)
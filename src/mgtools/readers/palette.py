@@ -1,8 +1,9 @@
 import struct
 import xml.etree.ElementTree as ET
-from io import BufferedReader, BytesIO
+from io import BufferedReader, BufferedWriter, BytesIO
 from pathlib import Path
 
+from mgtools.chunk import read_chunk
 from mgtools.enumerators.data_type import DataType
 from mgtools.file import File
 
@@ -10,26 +11,17 @@ from mgtools.file import File
 class Palette(File):
 
     @property
-    def raw_data(self) -> bytes:
-        raw_bytes = self.data_type.to_bytes(2)
-
-        palette_data = b""
-        palette_data += (len(self.__colors) * 4).to_bytes(4)
+    def palette_bytes(self) -> bytes:
+        palette = bytearray()
 
         for r, g, b in self.__colors:
-            palette_data += struct.pack("BBBB", b, g, r, 0)
+            palette.extend((r, g, b))
 
-        raw_bytes += len(palette_data).to_bytes(2) + palette_data
-        return raw_bytes
+        return bytes(palette)
 
     @property
-    def palette_bytes(self) -> bytes:
-        palette = b""
-
-        for r, g, b in self.__colors:
-            palette += bytes([r, g, b])
-
-        return palette
+    def colors(self) -> list[tuple[int, int, int]]:
+        return list(self.__colors)
 
     def __init__(self, data_type: DataType) -> None:
         super().__init__(data_type)
@@ -39,27 +31,28 @@ class Palette(File):
     def from_stream(
         reader: BufferedReader | BytesIO,
     ) -> Palette:
-        data_type = DataType(int.from_bytes(reader.read(2)))
+        return Palette.from_buffer(read_chunk(reader))
+
+    @staticmethod
+    def from_buffer(buffer: memoryview) -> Palette:
+        data_type = DataType(int.from_bytes(buffer[0:2]))
 
         if data_type != DataType.SIMPLE:
             raise ValueError("Palette files must have SIMPLE data type.")
 
-        data_length = int.from_bytes(reader.read(2))
-
-        palette_data = BytesIO(reader.read(data_length))
-
         f = Palette(data_type=data_type)
 
-        colors_count = int.from_bytes(palette_data.read(4)) // 4
+        colors_count = int.from_bytes(buffer[4:8]) // 4
 
-        for _ in range(colors_count):
-            b, g, r, _ = struct.unpack("BBBB", palette_data.read(4))
+        for b, g, r, _ in struct.iter_unpack("BBBB", buffer[8 : 8 + colors_count * 4]):
             f.add_data(r=r, g=g, b=b)
 
+        f.set_source_data(buffer)
+
         return f
 
     @staticmethod
-    def from_file(file_path: Path) -> Palette:
+    def from_file(file_path: Path, **kwargs) -> Palette:
         xmlroot = ET.parse(file_path).getroot()
 
         f = Palette(data_type=DataType.SIMPLE)
@@ -74,6 +67,8 @@ class Palette(File):
         return f
 
     def add_data(self, **kwargs) -> None:
+        self.mark_dirty()
+
         self.__colors.append(
             (
                 kwargs.get("r", 0),
@@ -82,6 +77,38 @@ class Palette(File):
             )
         )
 
+    def set_color(self, index: int, r: int, g: int, b: int) -> None:
+        self.mark_dirty()
+        self.__colors[index] = (r, g, b)
+
+    def write_to(self, stream: BufferedWriter | BytesIO, **kwargs) -> None:
+        colors_data = bytearray()
+
+        for r, g, b in self.__colors:
+            colors_data.extend(struct.pack("BBBB", b, g, r, 0))
+
+        stream.write(self.data_type.to_bytes(2))
+        stream.write((len(colors_data) + 4).to_bytes(2))
+        stream.write(len(colors_data).to_bytes(4))
+        stream.write(colors_data)
+
+    def get_differences(self, other: File) -> list[str]:
+        if not isinstance(other, Palette):
+            return [f"File type changed to {type(other).__name__}"]
+
+        differences = []
+
+        if len(self.__colors) != len(other.__colors):
+            differences.append(
+                f"Colors count: {len(self.__colors)} -> {len(other.__colors)}"
+            )
+
+        for i, (color, other_color) in enumerate(zip(self.__colors, other.__colors)):
+            if color != other_color:
+                differences.append(f"Color {i}: {color} -> {other_color}")
+
+        return differences
+
     def export(self, output_path: Path, **kwargs) -> None:
         root = ET.Element("Palette")
 
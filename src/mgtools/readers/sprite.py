@@ -1,8 +1,10 @@
-from io import BufferedReader, BytesIO
+import struct
+from io import BufferedReader, BufferedWriter, BytesIO
 from pathlib import Path
 
 from PIL import Image
 
+from mgtools.chunk import read_chunk
 from mgtools.enumerators.data_type import DataType
 from mgtools.file import File
 from mgtools.readers.palette import Palette
@@ -10,58 +12,66 @@ from mgtools.readers.palette import Palette
 
 class Sprite(File):
 
-    @property
-    def raw_data(self) -> bytes:
-        raw_bytes = self.data_type.to_bytes(2)
-
-        data = b""
-
-        for variant in self.__variants:
-            data += self.__get_sprite_bytes(variant)
-
-        data += (0).to_bytes(4)  # End of data marker
-        raw_bytes += len(data).to_bytes(2) + data
-        return raw_bytes
-
     def __init__(self, data_type: DataType) -> None:
         super().__init__(data_type)
         self.__variants: list[Image.Image] = []
 
     @staticmethod
     def from_stream(reader: BufferedReader | BytesIO) -> Sprite:
-        data_type = DataType(int.from_bytes(reader.read(2)))
+        return Sprite.from_buffer(read_chunk(reader))
+
+    @staticmethod
+    def from_buffer(buffer: memoryview) -> Sprite:
+        data_type = DataType(int.from_bytes(buffer[0:2]))
 
         if data_type != DataType.SIMPLE:
             raise ValueError("Sprite files must have SIMPLE data type.")
 
         f = Sprite(data_type=data_type)
 
-        data_length = int.from_bytes(reader.read(2))
-        data = reader.read(data_length)
+        data_length = int.from_bytes(buffer[2:4])
+        f.add_data(buffer=buffer[4 : 4 + data_length])
 
-        f.add_data(reader=BytesIO(data))
+        f.set_source_data(buffer)
 
         return f
 
     @staticmethod
-    def __get_sprite_bytes(image: Image.Image) -> bytes:
-        image_bytes = image.tobytes()
-
-        sprite_bytes = (len(image_bytes) + 8).to_bytes(4)
-        sprite_bytes += image.width.to_bytes(4, "little")
-        sprite_bytes += image.height.to_bytes(4, "little")
-        sprite_bytes += image_bytes
-
-        return sprite_bytes
+    def __write_sprite(
+        stream: BufferedWriter | BytesIO, image: Image.Image, image_bytes: bytes
+    ) -> None:
+        stream.write((len(image_bytes) + 8).to_bytes(4))
+        stream.write(image.width.to_bytes(4, "little"))
+        stream.write(image.height.to_bytes(4, "little"))
+        stream.write(image_bytes)
 
     @staticmethod
-    def __get_sprite_bytes_from_file(path: Path) -> bytes:
+    def __write_sprite_from_file(stream: BytesIO, path: Path) -> None:
         image = Image.open(path)
-        return Sprite.__get_sprite_bytes(image)
+        Sprite.__write_sprite(stream, image, image.tobytes())
+
+    @staticmethod
+    def get_source_paths(file_path: Path) -> list[Path]:
+        if file_path.exists():
+            return [file_path]
+
+        variant_paths = []
+
+        while True:
+            indexed_file_path = file_path.with_stem(
+                f"{file_path.stem}_{len(variant_paths)}"
+            )
+
+            if not indexed_file_path.exists():
+                break
+
+            variant_paths.append(indexed_file_path)
+
+        return variant_paths or [file_path]
 
     @staticmethod
-    def from_file(file_path: Path) -> Sprite:
-        sprite_bytes = b""
+    def from_file(file_path: Path, **kwargs) -> Sprite:
+        sprite_stream = BytesIO()
 
         if not file_path.exists():
             # Check if any variant file exists
@@ -82,14 +92,15 @@ class Sprite(File):
                     break
 
                 current_index += 1
-                sprite_bytes += Sprite.__get_sprite_bytes_from_file(indexed_file_path)
+                Sprite.__write_sprite_from_file(sprite_stream, indexed_file_path)
         else:
-            sprite_bytes += Sprite.__get_sprite_bytes_from_file(file_path)
+            Sprite.__write_sprite_from_file(sprite_stream, file_path)
 
-        sprite_bytes += (0).to_bytes(4)  # End of data marker
+        sprite_stream.write((0).to_bytes(4))  # End of data marker
+        sprite_bytes = sprite_stream.getvalue()
 
-        return Sprite.from_stream(
-            BytesIO(
+        return Sprite.from_buffer(
+            memoryview(
                 DataType.SIMPLE.to_bytes(2)
                 + len(sprite_bytes).to_bytes(2)
                 + sprite_bytes
@@ -97,32 +108,87 @@ class Sprite(File):
         )
 
     def add_data(self, **kwargs) -> None:
-        reader = kwargs.get("reader")
+        self.mark_dirty()
 
-        if reader is None:
-            raise ValueError("Reader stream is required to add sprite data.")
+        buffer = kwargs.get("buffer")
 
-        while True:
-            data_length = int.from_bytes(reader.read(4))
+        if buffer is None and kwargs.get("reader") is not None:
+            buffer = memoryview(kwargs["reader"].read())
+
+        if buffer is None:
+            raise ValueError("Buffer is required to add sprite data.")
+
+        position = 0
+
+        while position + 4 <= len(buffer):
+            data_length = int.from_bytes(buffer[position : position + 4])
 
             if data_length == 0:
                 break
 
-            data = BytesIO(reader.read(data_length))
-
-            width = int.from_bytes(data.read(4), "little")
-            height = int.from_bytes(data.read(4), "little")
-            pixel_data = data.read()
+            width, height = struct.unpack_from("<II", buffer, position + 4)
+            pixel_data = buffer[position + 12 : position + 4 + data_length]
+            position += 4 + data_length
 
             image = Image.frombytes("P", (width, height), pixel_data)
             self.__variants.append(image)
 
+    def write_to(self, stream: BufferedWriter | BytesIO, **kwargs) -> None:
+        variants_bytes = [variant.tobytes() for variant in self.__variants]
+        data_length = sum(len(image_bytes) + 12 for image_bytes in variants_bytes) + 4
+
+        stream.write(self.data_type.to_bytes(2))
+        stream.write(data_length.to_bytes(2))
+
+        for variant, image_bytes in zip(self.__variants, variants_bytes):
+            Sprite.__write_sprite(stream, variant, image_bytes)
+
+        stream.write((0).to_bytes(4))  # End of data marker
+
+    def get_variants(self) -> list[Image.Image]:
+        # Images are handed out as-is and may be edited, so they get encoded again
+        self.mark_dirty()
+        return self.__variants
+
+    def set_variants(self, variants: list[Image.Image]) -> None:
+        for variant in variants:
+            if variant.mode != "P":
+                raise ValueError(
+                    f"Sprite variants must be palette images, got {variant.mode}."
+                )
+
+        self.mark_dirty()
+        self.__variants = list(variants)
+
     def add_palette(self, palette: Palette) -> None:
         palette_bytes = palette.palette_bytes
 
         for i in range(len(self.__variants)):
             self.__variants[i].putpalette(palette_bytes)
 
+    def get_differences(self, other: File) -> list[str]:
+        if not isinstance(other, Sprite):
+            return [f"File type changed to {type(other).__name__}"]
+
+        differences = []
+
+        if len(self.__variants) != len(other.__variants):
+            differences.append(
+                f"Variants count: {len(self.__variants)} -> {len(other.__variants)}"
+            )
+
+        for i, (variant, other_variant) in enumerate(
+            zip(self.__variants, other.__variants)
+        ):
+            if variant.size != other_variant.size:
+                differences.append(
+                    f"Variant {i} size: {variant.size} -> {other_variant.size}"
+                )
+            elif variant.tobytes() != other_variant.tobytes():
+                differences.append(f"Variant {i} pixels changed")
+
+        return differences
+
     def export(self, output_path: Path, **kwargs) -> None:
         for i, variant in enumerate(self.__variants):
             if len(self.__variants) > 1:
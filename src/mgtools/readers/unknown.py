@@ -1,96 +1,118 @@
-import os
-from io import BufferedReader, BytesIO
+from io import BufferedReader, BufferedWriter, BytesIO
 from pathlib import Path
 
+from mgtools.chunk import get_entries_count, read_chunk
 from mgtools.enumerators.data_type import DataType
 from mgtools.file import File
 
 
 class UnknownFile(File):
 
-    @property
-    def raw_data(self) -> bytes:
-        raw_bytes = self.data_type.to_bytes(2)
-
-        match self.data_type:
-            case DataType.SIMPLE:
-                raw_bytes += len(self.__data[0]).to_bytes(2) + self.__data[0]
-            case DataType.WITH_COUNT:
-                raw_bytes += (len(self.__data) * 2).to_bytes(2)
-
-                for entry in self.__data:
-                    raw_bytes += len(entry).to_bytes(4) + entry
-
-                raw_bytes += (0).to_bytes(4)  # Padding
-            case DataType.MG1_FONT | DataType.MG1_TEXTURE:
-                raw_bytes += b"\0\0"  # Identifier placeholder
-
-                for entry in self.__data:
-                    raw_bytes += len(entry).to_bytes(4) + entry
-            case _:
-                raise ValueError(f"Unknown data type: {self.data_type}")
-
-        return raw_bytes
-
     def __init__(self, data_type: DataType) -> None:
         super().__init__(data_type)
-        self.__data: list[bytes] = []
+        self.__data: list[bytes | memoryview] = []
 
     @staticmethod
     def from_stream(reader: BufferedReader | BytesIO) -> UnknownFile:
-        data_type = DataType(int.from_bytes(reader.read(2)))
+        return UnknownFile.from_buffer(read_chunk(reader))
+
+    @staticmethod
+    def from_buffer(buffer: memoryview) -> UnknownFile:
+        data_type = DataType(int.from_bytes(buffer[0:2]))
 
         f = UnknownFile(data_type)
 
         match data_type:
             case DataType.SIMPLE:
-                data_length = int.from_bytes(reader.read(2))
-                data = reader.read(data_length)
-
-                f.add_data(file_data=data)
+                data_length = int.from_bytes(buffer[2:4])
+                f.add_data(file_data=buffer[4 : 4 + data_length])
             case DataType.WITH_COUNT:
-                entries_count = int.from_bytes(reader.read(2)) // 2
+                entries_count = int.from_bytes(buffer[2:4]) // 2
+                position = 4
 
                 for _ in range(entries_count):
-                    entry_length = int.from_bytes(reader.read(4))
-                    data = reader.read(entry_length)
-                    f.add_data(file_data=data)
-
-                reader.seek(4, os.SEEK_CUR)  # Skip padding
-            case DataType.MG1_FONT:
-                identifier = reader.read(2)  # Figure out the meaning of this
-
-                for _ in range(5):  # Figure out where this 5 comes from
-                    entry_size = int.from_bytes(reader.read(4))
-                    entry_data = reader.read(entry_size)
-                    f.add_data(file_data=entry_data)
-            case DataType.MG1_TEXTURE:
-                identifier = reader.read(2)  # Figure out the meaning of this
-
-                for _ in range(2):  # Figure out where this 2 comes from
-                    entry_size = int.from_bytes(reader.read(4))
-                    entry_data = reader.read(entry_size)
-                    f.add_data(file_data=entry_data)
+                    entry_length = int.from_bytes(buffer[position : position + 4])
+                    position += 4
+                    f.add_data(file_data=buffer[position : position + entry_length])
+                    position += entry_length
+            case DataType.MG1_FONT | DataType.MG1_TEXTURE:
+                identifier = buffer[2:4]  # Figure out the meaning of this
+                position = 4
+
+                for _ in range(get_entries_count(data_type)):
+                    entry_size = int.from_bytes(buffer[position : position + 4])
+                    position += 4
+                    f.add_data(file_data=buffer[position : position + entry_size])
+                    position += entry_size
             case _:
                 raise ValueError(f"Unknown data type: {data_type}")
 
+        f.set_source_data(buffer)
+
         return f
 
     @staticmethod
-    def from_file(file_path: Path, data_type: DataType | None = None) -> UnknownFile:
+    def from_file(
+        file_path: Path, data_type: DataType | None = None, **kwargs
+    ) -> UnknownFile:
         if data_type is None:
             raise ValueError("Data type must be provided for UnknownFile.")
 
         with open(file_path, "rb") as f:
             data = f.read()
-            return UnknownFile.from_stream(BytesIO(data))
+            return UnknownFile.from_buffer(memoryview(data))
 
     def add_data(self, **kwargs) -> None:
+        self.mark_dirty()
+
         if "file_data" not in kwargs:
             raise ValueError("Missing 'file_data' argument.")
 
         self.__data.append(kwargs["file_data"])
 
+    def write_to(self, stream: BufferedWriter | BytesIO, **kwargs) -> None:
+        stream.write(self.data_type.to_bytes(2))
+
+        match self.data_type:
+            case DataType.SIMPLE:
+                stream.write(len(self.__data[0]).to_bytes(2))
+                stream.write(self.__data[0])
+            case DataType.WITH_COUNT:
+                stream.write((len(self.__data) * 2).to_bytes(2))
+
+                for entry in self.__data:
+                    stream.write(len(entry).to_bytes(4))
+                    stream.write(entry)
+
+                stream.write((0).to_bytes(4))  # Padding
+            case DataType.MG1_FONT | DataType.MG1_TEXTURE:
+                stream.write(b"\0\0")  # Identifier placeholder
+
+                for entry in self.__data:
+                    stream.write(len(entry).to_bytes(4))
+                    stream.write(entry)
+            case _:
+                raise ValueError(f"Unknown data type: {self.data_type}")
+
+    def get_differences(self, other: File) -> list[str]:
+        if not isinstance(other, UnknownFile):
+            return [f"File type changed to {type(other).__name__}"]
+
+        differences = []
+
+        if len(self.__data) != len(other.__data):
+            differences.append(
+                f"Entries count: {len(self.__data)} -> {len(other.__data)}"
+            )
+
+        for i, (entry, other_entry) in enumerate(zip(self.__data, other.__data)):
+            if entry != other_entry:
+                differences.append(
+                    f"Entry {i} changed ({len(entry)} -> {len(other_entry)} bytes)"
+                )
+
+        return differences
+
     def export(self, output_path: Path, **kwargs) -> None:
         with open(output_path, "wb") as f:
-            f.write(self.raw_data)
+            self.write_to(f)
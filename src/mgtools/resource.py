@@ -1,14 +1,28 @@
+import hashlib
+import json
+import mmap
+import os
+from collections.abc import Iterator
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from functools import lru_cache
+from io import BufferedWriter, BytesIO
 from pathlib import Path
+from typing import TYPE_CHECKING
 
+from mgtools.cache import BuildCache
+from mgtools.chunk import VerifyingWriter, get_chunk_length
 from mgtools.constants import (
     EXPORT_FONT_FOLDER,
     EXPORT_LOCALE_FOLDER,
     EXPORT_PALETTE_EXTENSION,
+    EXPORT_RESOURCE_METADATA_FILENAME,
     EXPORT_SPRITE_EXTENSION,
     EXPORT_SPRITE_FOLDER,
     EXPORT_UNKNOWN_EXTENSION,
     EXPORT_UNKNOWN_FOLDER,
 )
+from mgtools.dataclasses.chunk import Chunk
 from mgtools.enumerators.data_type import DataType
 from mgtools.enumerators.file_type import FileType
 from mgtools.enumerators.game import Game
@@ -16,11 +30,11 @@ from mgtools.enumerators.platform import Platform
 from mgtools.file import File
 from mgtools.mg1.constants import RESOURCE_FILES_COUNT, RESOURCE_MAGIC
 from mgtools.mg1.mappings import DATA_TYPE_MAP, FILE_NAME_MAP, FILE_TYPE_MAP
-from mgtools.readers.font import Font
-from mgtools.readers.locale import Locale
-from mgtools.readers.palette import Palette
-from mgtools.readers.sprite import Sprite
-from mgtools.readers.unknown import UnknownFile
+from mgtools.readers import get_reader_class
+from mgtools.store import ChunkStore
+
+if TYPE_CHECKING:
+    from mgtools.profiler import Profiler
 
 
 class Resource:
@@ -28,66 +42,239 @@ class Resource:
     __game: Game = Game.UNKNOWN
     __platform: Platform = Platform.UNKNOWN
 
-    __files: list[File] = []
-
     @property
     def file_count(self) -> int:
         return len(self.__files)
 
+    @property
+    def game(self) -> Game:
+        return self.__game
+
+    @property
+    def platform(self) -> Platform:
+        return self.__platform
+
+    @property
+    def source_path(self) -> Path | None:
+        return self.__source_path
+
+    @property
+    def profiler(self) -> Profiler | None:
+        return self.__profiler
+
     def __init__(self, game: Game, platform: Platform) -> None:
         self.__game = game
         self.__platform = platform
 
+        self.__source_path: Path | None = None
+        self.__chunks: list[Chunk | None] = []
+        self.__files: list[File | None] = []
+        self.__profiler: Profiler | None = None
+        self.__mapping: mmap.mmap | None = None
+
+    def __enter__(self) -> Resource:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
     def __str__(self) -> str:
         return f"Resource(game={self.__game.name}, platform={self.__platform.name}, files_count={self.file_count})"
 
     @staticmethod
     def from_file(file_path: Path) -> Resource:
         with open(file_path, "rb") as f:
-            resource_magic = f.read(2)
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
 
-            if resource_magic == RESOURCE_MAGIC:
-                resource_game = Game.MG1
-                resource_files_count = RESOURCE_FILES_COUNT
-            else:
-                raise ValueError("Cannot determine game from resource magic.")
+        # Readers get zero-copy slices of the mapping, close() releases it
+        res = Resource.from_buffer(memoryview(mapping))
+        res.__source_path = file_path
+        res.__mapping = mapping
+
+        return res
 
-            resource_platform = Platform(int.from_bytes(f.read(2)))
+    def close(self) -> None:
+        self.__chunks = [None] * len(self.__chunks)
+        self.__files = [None] * len(self.__files)
 
-            res = Resource(resource_game, resource_platform)
+        if self.__mapping is not None:
+            try:
+                self.__mapping.close()
+            except BufferError:
+                # Files or views still referenced elsewhere keep the mapping
+                # open until they are gone
+                pass
 
-            for idx in range(resource_files_count):
-                res.__read_chunk(idx, f)
+            self.__mapping = None
+
+    @staticmethod
+    def from_bytes(data: bytes | bytearray) -> Resource:
+        return Resource.from_buffer(memoryview(data).toreadonly())
+
+    @staticmethod
+    def from_buffer(buffer: memoryview) -> Resource:
+        # Chunks are slices of the buffer, it must not change while in use
+        resource_magic = buffer[0:2]
+
+        if resource_magic == RESOURCE_MAGIC:
+            resource_game = Game.MG1
+            resource_files_count = RESOURCE_FILES_COUNT
+        else:
+            raise ValueError("Cannot determine game from resource magic.")
+
+        resource_platform = Platform(int.from_bytes(buffer[2:4]))
+
+        res = Resource(resource_game, resource_platform)
+
+        offset = 4
+        for idx in range(resource_files_count):
+            offset += res.__scan_chunk(idx, buffer, offset)
 
         return res
 
-    def __read_chunk(self, index, reader) -> None:
+    def __get_file_type(self, index: int) -> FileType:
         match self.__game:
             case Game.MG1:
-                file_type = FILE_TYPE_MAP.get(index, FileType.UNKNOWN)
+                return FILE_TYPE_MAP.get(index, FileType.UNKNOWN)
             case _:
                 raise ValueError(f"Unsupported game: {self.__game}")
 
-        match file_type:
-            case FileType.SPRITE:
-                sprite = Sprite.from_stream(reader)
-                self.__files.append(sprite)
-            case FileType.PALETTE:
-                palette = Palette.from_stream(reader)
-                self.__files.append(palette)
-            case FileType.LOCALE:
-                locale = Locale.from_stream(reader)
-                self.__files.append(locale)
-            case FileType.FONT:
-                font = Font.from_stream(reader)
-                self.__files.append(font)
-            case _:
-                file = UnknownFile.from_stream(reader)
-                self.__files.append(file)
+    def __scan_chunk(self, index: int, buffer: memoryview, offset: int) -> int:
+        # Walk the chunk headers only, payloads are decoded on first access
+        chunk_length = get_chunk_length(buffer, offset)
+        data_type = DataType(int.from_bytes(buffer[offset : offset + 2]))
+
+        self.__chunks.append(
+            Chunk(
+                index=index,
+                offset=offset,
+                length=chunk_length,
+                data_type=data_type,
+                file_type=self.__get_file_type(index),
+                data=buffer[offset : offset + chunk_length],
+            )
+        )
+        self.__files.append(None)
+
+        return chunk_length
+
+    def __add_chunk(self, index: int, data: memoryview) -> None:
+        self.__chunks.append(
+            Chunk(
+                index=index,
+                offset=0,
+                length=len(data),
+                data_type=DataType(int.from_bytes(data[0:2])),
+                file_type=self.__get_file_type(index),
+                data=data,
+            )
+        )
+        self.__files.append(None)
+
+    def __decode_chunk(self, chunk: Chunk) -> File:
+        reader_class = get_reader_class(chunk.file_type)
+
+        if self.__profiler is None:
+            return reader_class.from_buffer(chunk.data)
+
+        with self.__profiler.measure(
+            chunk.index, chunk.file_type, "decode", reader_class
+        ) as stats:
+            stats.bytes_in += chunk.length
+            return reader_class.from_buffer(chunk.data)
+
+    def set_profiler(self, profiler: Profiler | None) -> None:
+        # Profiled chunks are always processed in this process
+        self.__profiler = profiler
+
+    def get_file(self, file_index: int) -> File:
+        file = self.__files[file_index]
 
-    def export(self, output_dir: Path, file_index: int, **kwargs) -> None:
+        if file is None:
+            chunk = self.__chunks[file_index]
+
+            if chunk is None:
+                raise ValueError(f"No data available for file {file_index}.")
+
+            file = self.__decode_chunk(chunk)
+            self.__files[file_index] = file
+
+        return file
+
+    def get_file_type(self, file_index: int) -> FileType:
+        return self.__get_file_type(file_index)
+
+    def get_chunk_data(self, file_index: int) -> bytes | memoryview:
         file = self.__files[file_index]
 
+        if file is not None:
+            return Resource.__get_encoded_data(file)
+
+        chunk = self.__chunks[file_index]
+
+        if chunk is None:
+            raise ValueError(f"No data available for file {file_index}.")
+
+        return chunk.data
+
+    def get_changed_chunks(self, other: Resource) -> list[int]:
+        changed_indices = []
+
+        for index in range(max(self.file_count, other.file_count)):
+            if index >= self.file_count or index >= other.file_count:
+                changed_indices.append(index)
+                continue
+
+            # Compare digests of the encoded bytes, nothing gets decoded
+            digest = hashlib.blake2b(self.get_chunk_data(index)).digest()
+            other_digest = hashlib.blake2b(other.get_chunk_data(index)).digest()
+
+            if digest != other_digest:
+                changed_indices.append(index)
+
+        return changed_indices
+
+    def verify_chunk(self, file_index: int, **kwargs) -> int | None:
+        chunk = self.__chunks[file_index]
+
+        if chunk is None:
+            raise ValueError(f"File {file_index} has no source data to verify against.")
+
+        # Decode a separate copy, so files already decoded stay untouched
+        file = get_reader_class(chunk.file_type).from_buffer(chunk.data)
+
+        # Force a full re-encode, readers otherwise pass untouched data through
+        writer = VerifyingWriter(chunk.data)
+        file.write_to(writer, force_encode=True, **kwargs)
+
+        return writer.get_first_difference()
+
+    def __get_palette_index(self) -> int | None:
+        for index in range(self.file_count):
+            if self.__get_file_type(index) == FileType.PALETTE:
+                return index
+
+        return None
+
+    def __get_export_dependencies(self, file_index: int) -> list[int]:
+        palette_index = self.__get_palette_index()
+
+        # Exported sprites embed the palette
+        if (
+            self.__get_file_type(file_index) == FileType.SPRITE
+            and palette_index is not None
+        ):
+            return [file_index, palette_index]
+
+        return [file_index]
+
+    def __is_modified(self, file_index: int) -> bool:
+        file = self.__files[file_index]
+        return (file is not None and file.is_dirty) or self.__chunks[file_index] is None
+
+    def export(self, output_dir: Path, file_index: int, **kwargs) -> None:
+        file = self.get_file(file_index)
+
         match self.__game:
             case Game.MG1:
                 file_type_map = FILE_TYPE_MAP
@@ -102,11 +289,16 @@ class Resource:
                 file_name = f"{file_name}.{EXPORT_SPRITE_EXTENSION}"
                 file_path = output_dir / EXPORT_SPRITE_FOLDER
 
-                # Find loaded palette to export alongside sprite
-                for other_file in self.__files:
-                    if isinstance(file, Sprite) and isinstance(other_file, Palette):
-                        file.add_palette(other_file)
-                        break
+                # Find palette to export alongside sprite
+                palette_index = self.__get_palette_index()
+
+                if palette_index is not None:
+                    palette = self.get_file(palette_index)
+
+                    if isinstance(
+                        file, get_reader_class(FileType.SPRITE)
+                    ) and isinstance(palette, get_reader_class(FileType.PALETTE)):
+                        file.add_palette(palette)
             case FileType.PALETTE:
                 file_name = f"{file_name}.{EXPORT_PALETTE_EXTENSION}"
                 file_path = output_dir
@@ -121,9 +313,144 @@ class Resource:
                 file_path = output_dir / EXPORT_UNKNOWN_FOLDER
 
         file_path.mkdir(parents=True, exist_ok=True)
-        file.export(file_path / file_name, **kwargs)
 
-    def add_from_folder(self, input_dir: Path, file_index: int) -> None:
+        if self.__profiler is None:
+            file.export(file_path / file_name, **kwargs)
+            return
+
+        file_type = self.__get_file_type(file_index)
+
+        with self.__profiler.measure(
+            file_index, file_type, "encode", type(file)
+        ) as stats:
+            file.export(file_path / file_name, **kwargs)
+
+        stats.bytes_out += get_paths_size(self.get_source_paths(output_dir, file_index))
+
+    def __export_chunks(
+        self,
+        targets: list[tuple[int, Path]],
+        jobs: int = 1,
+        executor: Executor | None = None,
+        **kwargs,
+    ) -> None:
+        if (
+            self.__source_path is None
+            or self.__profiler is not None
+            or (jobs <= 1 and executor is None)
+        ):
+            for index, output_dir in targets:
+                self.export(output_dir, index, **kwargs)
+
+            return
+
+        with get_executor(jobs, executor) as pool:
+            futures = []
+
+            for index, output_dir in targets:
+                # Workers re-read the source file, chunks depending on modified
+                # ones are exported here
+                if any(
+                    self.__is_modified(dependency)
+                    for dependency in self.__get_export_dependencies(index)
+                ):
+                    self.export(output_dir, index, **kwargs)
+                    continue
+
+                futures.append(
+                    pool.submit(
+                        export_chunk, self.__source_path, output_dir, index, **kwargs
+                    )
+                )
+
+            for future in futures:
+                future.result()
+
+    def export_all(
+        self,
+        output_dir: Path,
+        jobs: int = 1,
+        executor: Executor | None = None,
+        **kwargs,
+    ) -> None:
+        targets = [(index, output_dir) for index in range(self.file_count)]
+        self.__export_chunks(targets, jobs=jobs, executor=executor, **kwargs)
+        self.save_metadata(output_dir)
+
+    def save_metadata(self, output_dir: Path) -> None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        with open(
+            output_dir / EXPORT_RESOURCE_METADATA_FILENAME, "w", encoding="utf-8"
+        ) as f:
+            json.dump(
+                {"game": self.__game.name, "platform": self.__platform.name},
+                f,
+                indent=4,
+            )
+
+    @staticmethod
+    def load_platform(input_dir: Path) -> Platform | None:
+        # Folders exported by older versions don't record the platform
+        metadata_path = input_dir / EXPORT_RESOURCE_METADATA_FILENAME
+
+        if not metadata_path.is_file():
+            return None
+
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            return Platform[json.load(f)["platform"]]
+
+    def export_to_store(
+        self,
+        store: ChunkStore,
+        name: str,
+        jobs: int = 1,
+        executor: Executor | None = None,
+        **kwargs,
+    ) -> int:
+        keys: dict[str, str] = {}
+        targets: list[tuple[int, Path]] = []
+
+        for index in range(self.file_count):
+            key_parts = [
+                self.get_chunk_data(dependency)
+                for dependency in self.__get_export_dependencies(index)
+            ]
+
+            # Options other readers ignore would store their files twice
+            export_options = get_reader_class(
+                self.__get_file_type(index)
+            ).get_export_options()
+            key = ChunkStore.get_key(
+                index,
+                *key_parts,
+                **{name: kwargs[name] for name in export_options if name in kwargs},
+            )
+            keys[f"{index:02d}"] = key
+
+            # Chunks already stored for another resource are not exported again
+            if not store.has_object(key):
+                targets.append((index, store.get_staging_path(key)))
+
+        self.__export_chunks(targets, jobs=jobs, executor=executor, **kwargs)
+
+        for index, _ in targets:
+            store.commit_object(keys[f"{index:02d}"])
+
+        store.save_manifest(
+            name,
+            {
+                "game": self.__game.name,
+                "platform": self.__platform.name,
+                "files": keys,
+            },
+        )
+
+        return len(targets)
+
+    def __get_source(
+        self, input_dir: Path, file_index: int
+    ) -> tuple[type[File], Path, DataType]:
         match self.__game:
             case Game.MG1:
                 data_type_map = DATA_TYPE_MAP
@@ -133,47 +460,354 @@ class Resource:
                 raise ValueError(f"Unsupported game: {self.__game}")
 
         file_name = file_name_map.get(file_index, f"{file_index:02d}")
+        data_type = data_type_map.get(file_index, DataType.SIMPLE)
 
-        match file_type_map.get(file_index, FileType.UNKNOWN):
+        file_type = file_type_map.get(file_index, FileType.UNKNOWN)
+
+        match file_type:
             case FileType.SPRITE:
                 file_name = f"{file_name}.{EXPORT_SPRITE_EXTENSION}"
-                file_path = input_dir / EXPORT_SPRITE_FOLDER
-
-                file = Sprite.from_file(file_path / file_name)
-                self.__files.append(file)
+                file_path = input_dir / EXPORT_SPRITE_FOLDER / file_name
             case FileType.PALETTE:
                 file_name = f"{file_name}.{EXPORT_PALETTE_EXTENSION}"
-                file_path = input_dir
-
-                file = Palette.from_file(file_path / file_name)
-                self.__files.append(file)
+                file_path = input_dir / file_name
             case FileType.LOCALE:
                 file_path = input_dir / EXPORT_LOCALE_FOLDER
-
-                file = Locale.from_file(file_path)
-                self.__files.append(file)
             case FileType.FONT:
                 file_path = input_dir / EXPORT_FONT_FOLDER
-
-                file = Font.from_file(file_path)
-                self.__files.append(file)
             case _:
                 file_name = f"{file_name}.{EXPORT_UNKNOWN_EXTENSION}"
-                file_path = input_dir / EXPORT_UNKNOWN_FOLDER
-                data_type = data_type_map.get(file_index, DataType.SIMPLE)
+                file_path = input_dir / EXPORT_UNKNOWN_FOLDER / file_name
+
+        return get_reader_class(file_type), file_path, data_type
+
+    def get_source_paths(self, input_dir: Path, file_index: int) -> list[Path]:
+        file_class, file_path, _ = self.__get_source(input_dir, file_index)
+        return file_class.get_source_paths(file_path)
+
+    def load_from_folder(self, input_dir: Path, file_index: int, **kwargs) -> File:
+        file_class, file_path, data_type = self.__get_source(input_dir, file_index)
+
+        if self.__profiler is None:
+            return Resource.__load_source(file_class, file_path, data_type, **kwargs)
+
+        file_type = self.__get_file_type(file_index)
+
+        with self.__profiler.measure(
+            file_index, file_type, "decode", file_class
+        ) as stats:
+            file = Resource.__load_source(file_class, file_path, data_type, **kwargs)
+
+        stats.bytes_in += get_paths_size(file_class.get_source_paths(file_path))
+        return file
+
+    @staticmethod
+    def __load_source(
+        file_class: type[File], file_path: Path, data_type: DataType, **kwargs
+    ) -> File:
+        if file_class is get_reader_class(FileType.UNKNOWN):
+            return file_class.from_file(file_path, data_type=data_type, **kwargs)
+
+        return file_class.from_file(file_path, **kwargs)
+
+    def __encode_file(self, file_index: int, file: File) -> bytes:
+        if self.__profiler is None:
+            return file.raw_data
+
+        file_type = self.__get_file_type(file_index)
+
+        with self.__profiler.measure(
+            file_index, file_type, "encode", type(file)
+        ) as stats:
+            encoded_data = file.raw_data
+
+        stats.bytes_out += len(encoded_data)
+        return encoded_data
+
+    def __get_fingerprint(
+        self, cache: BuildCache, input_dir: Path, file_index: int, **kwargs
+    ) -> str:
+        # Options other readers ignore must not invalidate their cached chunks
+        import_options = get_reader_class(
+            self.__get_file_type(file_index)
+        ).get_import_options()
+
+        return cache.get_fingerprint(
+            input_dir,
+            self.get_source_paths(input_dir, file_index),
+            **{name: kwargs[name] for name in import_options if name in kwargs},
+        )
+
+    def add_from_folder(
+        self,
+        input_dir: Path,
+        file_index: int,
+        cache: BuildCache | None = None,
+        **kwargs,
+    ) -> None:
+        if cache is None:
+            self.__add_file(self.load_from_folder(input_dir, file_index, **kwargs))
+            return
+
+        fingerprint = self.__get_fingerprint(cache, input_dir, file_index, **kwargs)
+        encoded_data = cache.load(file_index, fingerprint)
+
+        if encoded_data is None:
+            # Keep the encoded form, the chunk is decoded again only if accessed
+            encoded_data = memoryview(
+                self.__encode_file(
+                    file_index, self.load_from_folder(input_dir, file_index, **kwargs)
+                )
+            )
+            cache.store(file_index, fingerprint, encoded_data)
+        elif self.__profiler is not None:
+            stats = self.__profiler.get_stats(
+                file_index, self.__get_file_type(file_index)
+            )
+            stats.bytes_out += len(encoded_data)
+            stats.cached = True
+
+        self.__add_chunk(file_index, encoded_data)
+
+    @staticmethod
+    def from_folder(
+        input_dir: Path,
+        game: Game,
+        platform: Platform,
+        jobs: int = 1,
+        executor: Executor | None = None,
+        cache: BuildCache | None = None,
+        profiler: Profiler | None = None,
+        **kwargs,
+    ) -> Resource:
+        match game:
+            case Game.MG1:
+                resource_files_count = RESOURCE_FILES_COUNT
+            case _:
+                raise ValueError(f"Unsupported game: {game}")
+
+        res = Resource(game, platform)
+        res.set_profiler(profiler)
+
+        if profiler is not None or (jobs <= 1 and executor is None):
+            for index in range(resource_files_count):
+                res.add_from_folder(input_dir, index, cache=cache, **kwargs)
+
+            return res
+
+        with get_executor(jobs, executor) as pool:
+            fingerprints: list[str | None] = []
+            pending: list[memoryview | Future] = []
+
+            for index in range(resource_files_count):
+                fingerprint = None
+
+                if cache is not None:
+                    fingerprint = res.__get_fingerprint(
+                        cache, input_dir, index, **kwargs
+                    )
+                    encoded_data = cache.load(index, fingerprint)
+
+                    if encoded_data is not None:
+                        fingerprints.append(fingerprint)
+                        pending.append(encoded_data)
+                        continue
+
+                fingerprints.append(fingerprint)
+                pending.append(
+                    pool.submit(encode_chunk, game, input_dir, index, **kwargs)
+                )
+
+            # Assemble in index order, whatever order the workers finish in
+            for index, (fingerprint, result) in enumerate(zip(fingerprints, pending)):
+                if isinstance(result, Future):
+                    encoded_data = memoryview(result.result())
+
+                    if cache is not None and fingerprint is not None:
+                        cache.store(index, fingerprint, encoded_data)
+                else:
+                    encoded_data = result
+
+                res.__add_chunk(index, encoded_data)
+
+        return res
+
+    def __add_file(self, file: File) -> None:
+        self.__chunks.append(None)
+        self.__files.append(file)
 
-                file = UnknownFile.from_file(file_path / file_name, data_type=data_type)
-                self.__files.append(file)
+    def replace_chunk(self, file_index: int, file: File) -> None:
+        if not 0 <= file_index < self.file_count:
+            raise IndexError(f"File index {file_index} is out of range.")
+
+        file_type = self.__get_file_type(file_index)
+        expected_class = File
+
+        if file_type != FileType.UNKNOWN:
+            expected_class = get_reader_class(file_type)
+
+        if not isinstance(file, expected_class):
+            raise ValueError(
+                f"File {file_index} must be {expected_class.__name__}, got {type(file).__name__}."
+            )
+
+        self.__files[file_index] = file
+
+    @staticmethod
+    def __get_encoded_data(file: File) -> bytes | memoryview:
+        # Clean files pass their original bytes through without re-encoding
+        if not file.is_dirty and file.source_data is not None:
+            return file.source_data
+
+        return file.raw_data
+
+    def __is_source_file(self, output_path: Path) -> bool:
+        return (
+            self.__source_path is not None
+            and output_path.exists()
+            and os.path.samefile(output_path, self.__source_path)
+        )
+
+    def __save_in_place(self, encoded_files: dict[int, bytes | memoryview]) -> bool:
+        patches: list[tuple[int, bytes | memoryview]] = []
+
+        for index, encoded_data in encoded_files.items():
+            chunk = self.__chunks[index]
+
+            if chunk is None or chunk.length != len(encoded_data):
+                return False
+
+            if chunk.data != encoded_data:
+                patches.append((chunk.offset, encoded_data))
+
+        if self.__source_path is not None and patches:
+            with open(self.__source_path, "r+b") as f:
+                for offset, encoded_data in patches:
+                    f.seek(offset)
+                    f.write(encoded_data)
+
+        return True
 
     def save(self, output_path: Path) -> None:
-        with open(output_path, "wb") as f:
-            match self.__game:
-                case Game.MG1:
-                    f.write(RESOURCE_MAGIC)
-                case _:
-                    raise ValueError(f"Unsupported game: {self.__game}")
+        encoded_files: dict[int, bytes | memoryview] = {}
+        is_source_file = self.__is_source_file(output_path)
+
+        if is_source_file:
+            # Only decoded or replaced chunks can differ from the file, when
+            # they keep their size they are written over the original bytes
+            encoded_files = {
+                index: Resource.__get_encoded_data(file)
+                for index, file in enumerate(self.__files)
+                if file is not None
+            }
+
+            if self.__save_in_place(encoded_files):
+                return
+
+        # Write next to the target first, so saving over the source file
+        # does not truncate chunks that were never decoded
+        temp_path = output_path.with_name(f"{output_path.name}.tmp")
+
+        with open(temp_path, "wb") as f:
+            self.__write_to(f, encoded_files)
+
+        if not is_source_file:
+            os.replace(temp_path, output_path)
+            return
+
+        # Windows can't replace a file that is still mapped, the resource
+        # continues from the saved file and decodes its files from there again
+        encoded_files.clear()
+        self.close()
+        os.replace(temp_path, output_path)
+
+        saved = Resource.from_file(output_path)
+        self.__chunks = saved.__chunks
+        self.__files = saved.__files
+        self.__mapping = saved.__mapping
+
+    def write_to(self, stream: BufferedWriter | BytesIO) -> None:
+        self.__write_to(stream, {})
+
+    def to_bytes(self) -> bytes:
+        stream = BytesIO()
+        self.__write_to(stream, {})
+
+        return stream.getvalue()
+
+    def __write_to(
+        self,
+        stream: BufferedWriter | BytesIO,
+        encoded_files: dict[int, bytes | memoryview],
+    ) -> None:
+        match self.__game:
+            case Game.MG1:
+                stream.write(RESOURCE_MAGIC)
+            case _:
+                raise ValueError(f"Unsupported game: {self.__game}")
+
+        stream.write(self.__platform.value.to_bytes(2))
+
+        for index, (file, chunk) in enumerate(zip(self.__files, self.__chunks)):
+            if index in encoded_files:
+                stream.write(encoded_files[index])
+            elif file is None and chunk is not None:
+                # Untouched chunks are copied verbatim
+                stream.write(chunk.data)
+            elif file is not None and self.__profiler is not None:
+                self.__write_file(stream, index, file)
+            elif file is not None and not file.is_dirty:
+                stream.write(Resource.__get_encoded_data(file))
+            elif file is not None:
+                file.write_to(stream)
+
+    def __write_file(
+        self, stream: BufferedWriter | BytesIO, file_index: int, file: File
+    ) -> None:
+        file_type = self.__get_file_type(file_index)
+
+        # Clean files are passed through, that is still the work done for them
+        with self.__profiler.measure(
+            file_index, file_type, "encode", type(file)
+        ) as stats:
+            encoded_data = Resource.__get_encoded_data(file)
+            stream.write(encoded_data)
+
+        stats.bytes_out += len(encoded_data)
+
+
+def get_paths_size(paths: list[Path]) -> int:
+    return sum(path.stat().st_size for path in paths if path.is_file())
+
+
+@lru_cache(maxsize=4)
+def load_cached_resource(file_path: Path, mtime_ns: int, size: int) -> Resource:
+    # Worker processes reuse the scanned resource until the file changes
+    return Resource.from_file(file_path)
+
+
+@contextmanager
+def get_executor(jobs: int, executor: Executor | None = None) -> Iterator[Executor]:
+    # Executors passed in are shared by the caller and stay open
+    if executor is not None:
+        yield executor
+        return
+
+    # Worker processes are only needed for parallel runs
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield pool
+
+
+def export_chunk(
+    source_path: Path, output_dir: Path, file_index: int, **kwargs
+) -> None:
+    stat = source_path.stat()
+    resource = load_cached_resource(source_path, stat.st_mtime_ns, stat.st_size)
+    resource.export(output_dir, file_index, **kwargs)
 
-            f.write(self.__platform.value.to_bytes(2))
 
-            for file in self.__files:
-                f.write(file.raw_data)
+def encode_chunk(game: Game, input_dir: Path, file_index: int, **kwargs) -> bytes:
+    resource = Resource(game, Platform.UNKNOWN)
+    return resource.load_from_folder(input_dir, file_index, **kwargs).raw_data
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+from mgtools.constants import (
+    CHUNK_STORE_MANIFEST_EXTENSION,
+    CHUNK_STORE_MANIFESTS_FOLDER,
+    CHUNK_STORE_OBJECTS_FOLDER,
+    CHUNK_STORE_VERSION,
+    EXPORT_RESOURCE_METADATA_FILENAME,
+)
+
+
+class ChunkStore:
+
+    @property
+    def store_dir(self) -> Path:
+        return self.__store_dir
+
+    def __init__(self, store_dir: Path) -> None:
+        self.__store_dir = store_dir
+
+    @staticmethod
+    def get_key(file_index: int, *parts: bytes | memoryview, **kwargs) -> str:
+        key = hashlib.blake2b(digest_size=20)
+        key.update(
+            f"{CHUNK_STORE_VERSION}\0{file_index}\0{sorted(kwargs.items())}".encode()
+        )
+
+        for part in parts:
+            key.update(len(part).to_bytes(4))
+            key.update(part)
+
+        return key.hexdigest()
+
+    def get_object_path(self, key: str) -> Path:
+        return self.__store_dir / CHUNK_STORE_OBJECTS_FOLDER / key[:2] / key
+
+    def get_manifest_path(self, name: str) -> Path:
+        return (
+            self.__store_dir
+            / CHUNK_STORE_MANIFESTS_FOLDER
+            / f"{name}.{CHUNK_STORE_MANIFEST_EXTENSION}"
+        )
+
+    def has_object(self, key: str) -> bool:
+        return self.get_object_path(key).is_dir()
+
+    def get_staging_path(self, key: str) -> Path:
+        object_path = self.get_object_path(key)
+        return object_path.with_name(f".{key}.{os.getpid()}.tmp")
+
+    def commit_object(self, key: str) -> None:
+        staging_path = self.get_staging_path(key)
+        staging_path.mkdir(parents=True, exist_ok=True)
+
+        try:
+            staging_path.rename(self.get_object_path(key))
+        except OSError:
+            # Another process stored the same chunk first
+            if not self.has_object(key):
+                raise
+
+            shutil.rmtree(staging_path)
+
+    def save_manifest(self, name: str, manifest: dict) -> None:
+        manifest_path = self.get_manifest_path(name)
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=4)
+
+    def load_manifest(self, name: str) -> dict:
+        with open(self.get_manifest_path(name), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def checkout(self, name: str, output_dir: Path, link: bool = False) -> None:
+        manifest = self.load_manifest(name)
+
+        for key in manifest["files"].values():
+            object_path = self.get_object_path(key)
+
+            for source_path in object_path.rglob("*"):
+                if source_path.is_dir():
+                    continue
+
+                target_path = output_dir / source_path.relative_to(object_path)
+                target_path.parent.mkdir(parents=True, exist_ok=True)
+                target_path.unlink(missing_ok=True)
+
+                if link:
+                    os.link(source_path, target_path)
+                else:
+                    shutil.copy2(source_path, target_path)
+
+        # Same metadata export writes, generate takes the platform from it
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        with open(
+            output_dir / EXPORT_RESOURCE_METADATA_FILENAME, "w", encoding="utf-8"
+        ) as f:
+            json.dump(
+                {"game": manifest["game"], "platform": manifest["platform"]},
+                f,
+                indent=4,
+            )
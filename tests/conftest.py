@@ -0,0 +1,17 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Tests use the synthetic resources of the benchmarks, no game files needed
+sys.path.insert(0, str(Path(__file__).parents[1] / "benchmarks"))
+
+from synthetic import build_resource  # noqa: E402
+
+
+@pytest.fixture
+def resource_path(tmp_path: Path) -> Path:
+    resource_path = tmp_path / "resource.bin"
+    resource_path.write_bytes(build_resource())
+
+    return resource_path
@@ -0,0 +1,236 @@
+import codecs
+import random
+from array import array
+
+import pytest
+
+from mgtools.mgscii import (
+    MGSCII_TABLE,
+    SPECIAL_CHARS,
+    get_mgscii_char,
+    get_substitution_table,
+    read_mgscii_string,
+    read_mgscii_strings,
+    write_mgscii_string,
+)
+
+SUBSTITUTION_MAPS = [
+    None,
+    {"ą": 97, "ł": 108},
+    {"…": 46},
+    {"∞": 8734, "ę": 101},
+    {"€": 300},
+]
+
+
+# How strings were read and written before the codec, exports must not change
+def read_legacy_string(data: bytes) -> str:
+    text = ""
+    special_char_parsed = False
+
+    for byte in data:
+        if byte != 129 and not special_char_parsed:
+            text += get_mgscii_char(byte)
+        elif byte == 129 and not special_char_parsed:
+            special_char_parsed = True
+        elif special_char_parsed:
+            text += SPECIAL_CHARS.get(byte, "???")
+            special_char_parsed = False
+
+    return text
+
+
+def write_legacy_string(text: str, char_substition_map: dict | None = None) -> bytes:
+    reverse_map = {v: k for k, v in MGSCII_TABLE.items()}
+    special_chars_map = {v: k for k, v in SPECIAL_CHARS.items()}
+    data = bytearray()
+
+    for char in text:
+        if char_substition_map and char in char_substition_map:
+            code = char_substition_map[char]
+        else:
+            code = reverse_map.get(char)
+
+        if code is None:
+            code = 63
+
+        if code > 255:
+            if char in special_chars_map:
+                data.append(129)
+                data.append(special_chars_map[char])
+        else:
+            data.append(code)
+
+    return bytes(data)
+
+
+def get_random_data(rng: random.Random) -> bytes:
+    return bytes(
+        rng.choice([rng.randrange(256), 129, 99, 135, 65])
+        for _ in range(rng.randrange(16))
+    )
+
+
+def get_random_text(rng: random.Random) -> str:
+    chars = [*MGSCII_TABLE.values(), "ą", "ł", "ę", "€"]
+    return "".join(rng.choice(chars) for _ in range(rng.randrange(16)))
+
+
+@pytest.mark.parametrize(
+    "data, text",
+    [
+        (b"Snake", "Snake"),
+        (b"\x01", "???"),
+        (b"a\x81cb", "a…b"),
+        (b"\x81\x87", "∞"),
+        (b"a\x81\x01b", "a???b"),
+        (b"a\x81", "a"),
+        (b"\x81\x81c", "???c"),
+    ],
+)
+def test_read_string(data, text):
+    assert read_mgscii_string(data) == text
+    assert read_mgscii_string(data) == read_legacy_string(data)
+
+
+def test_read_string_matches_legacy():
+    rng = random.Random(0)
+
+    for _ in range(5000):
+        data = get_random_data(rng)
+
+        assert read_mgscii_string(data) == read_legacy_string(data)
+        assert read_mgscii_string(memoryview(b"xx" + data)[2:]) == read_mgscii_string(
+            data
+        )
+
+
+@pytest.mark.parametrize(
+    "char_substition_map",
+    SUBSTITUTION_MAPS,
+    ids=["none", "letters", "special", "special-escape", "above-byte"],
+)
+def test_write_string_matches_legacy(char_substition_map):
+    rng = random.Random(0)
+
+    for _ in range(2000):
+        text = get_random_text(rng) + "…∞"
+
+        assert write_mgscii_string(text, char_substition_map) == write_legacy_string(
+            text, char_substition_map
+        )
+
+
+@pytest.mark.parametrize(
+    "char_substition_map",
+    SUBSTITUTION_MAPS[1:],
+    ids=["letters", "special", "special-escape", "above-byte"],
+)
+def test_write_string_with_resolved_table(char_substition_map):
+    encoding_table = get_substitution_table(frozenset(char_substition_map.items()))
+    rng = random.Random(0)
+
+    for _ in range(200):
+        text = get_random_text(rng) + "…∞"
+
+        assert write_mgscii_string(
+            text, encoding_table=encoding_table
+        ) == write_mgscii_string(text, char_substition_map)
+
+
+def test_substitutions_take_precedence_over_escapes():
+    assert write_mgscii_string("Wait…", {"…": 46}) == b"Wait."
+    assert write_mgscii_string("Wait…∞", {"…": 46}) == b"Wait.\x81\x87"
+
+
+def test_read_strings_matches_single_reads():
+    rng = random.Random(0)
+    strings_data = [get_random_data(rng) for _ in range(200)]
+    offsets = array("I")
+    lengths = array("H")
+    data = bytearray()
+
+    for string_data in strings_data:
+        data += b"\0\0\0"
+        offsets.append(len(data))
+        lengths.append(len(string_data))
+        data += string_data
+
+    assert read_mgscii_strings(bytes(data), offsets, lengths) == [
+        read_mgscii_string(string_data) for string_data in strings_data
+    ]
+
+
+def test_codec_round_trip():
+    rng = random.Random(0)
+
+    for _ in range(2000):
+        data = get_random_data(rng)
+
+        try:
+            text = data.decode("mgscii")
+        except UnicodeDecodeError:
+            continue
+
+        assert text.encode("mgscii") == data
+
+
+def test_incremental_decoder():
+    rng = random.Random(0)
+
+    for _ in range(2000):
+        data = get_random_data(rng)
+        text = data.decode("mgscii", errors="mgscii-replace")
+        decoder = codecs.getincrementaldecoder("mgscii")(errors="mgscii-replace")
+
+        decoded = "".join(decoder.decode(data[i : i + 1]) for i in range(len(data)))
+        assert decoded + decoder.decode(b"", final=True) == text
+
+
+def test_encode_error_positions():
+    with pytest.raises(UnicodeEncodeError) as error:
+        "ab…cdąe".encode("mgscii")
+
+    assert error.value.encoding == "mgscii"
+    assert error.value.object == "ab…cdąe"
+    assert (error.value.start, error.value.end) == (5, 6)
+
+
+@pytest.mark.parametrize(
+    "data, position",
+    [(b"ab\x81cd\x01", 5), (b"ab\x81\x01", 2), (b"ab\x81", 2)],
+)
+def test_decode_error_positions(data, position):
+    with pytest.raises(UnicodeDecodeError) as error:
+        data.decode("mgscii")
+
+    assert error.value.encoding == "mgscii"
+    assert error.value.object == data
+    assert error.value.start == position
+
+
+@pytest.mark.parametrize(
+    "errors, encoded",
+    [
+        ("mgscii-replace", b"ab\x81ccd?e"),
+        ("replace", b"ab\x81ccd?e"),
+        ("ignore", b"ab\x81ccde"),
+        ("backslashreplace", b"ab\x81ccd\\u0105e"),
+        ("xmlcharrefreplace", b"ab\x81ccd&#261;e"),
+    ],
+)
+def test_encode_errors(errors, encoded):
+    assert "ab…cdąe".encode("mgscii", errors=errors) == encoded
+
+
+@pytest.mark.parametrize(
+    "errors, decoded",
+    [
+        ("mgscii-replace", "a???b…"),
+        ("replace", "a�b…"),
+        ("ignore", "ab…"),
+        ("backslashreplace", "a\\x01b…"),
+    ],
+)
+def test_decode_errors(errors, decoded):
+    assert b"a\x01b\x81c".decode("mgscii", errors=errors) == decoded
@@ -0,0 +1,178 @@
+import random
+
+import polib
+import pytest
+
+from mgtools.dataclasses.po_entry import PoEntry
+from mgtools.po import load_po_file, parse_po_entries, save_po_file
+
+# Characters polib escapes, wraps at or treats as line breaks
+TEXT_PARTS = [
+    *'abcdef ghij  -kl"\\\t\n\r\v\b\f\x85 \x1cé…-',
+    "word ",
+    "long-word ",
+    "  ",
+]
+
+ENTRIES = [
+    PoEntry("Snake", "", ["0"]),
+    PoEntry('Quote " and backslash \\', "translated", ["1"]),
+    PoEntry("Tab\tcarriage\rreturn\vvertical\bback\fform", "", ["2"]),
+    PoEntry("First line\nsecond line\nthird line", "", ["3"]),
+    PoEntry("Trailing newline\n", "Translated\n", ["0"]),
+    PoEntry("Long " * 40, "", ["1"]),
+    PoEntry("Unicode … ∞ àéîöü ñ ß ¡¿", "", []),
+    PoEntry("Comments", "", ["fuzzy", "2"], "translator\nnote", "extracted"),
+]
+
+
+def to_tuples(entries) -> list[tuple]:
+    return [
+        (entry.msgid, entry.msgstr, entry.flags, entry.tcomment, entry.comment)
+        for entry in entries
+    ]
+
+
+def save_with_polib(file_path, entries: list[PoEntry]) -> None:
+    po = polib.POFile()
+
+    for entry in entries:
+        po.append(
+            polib.POEntry(
+                msgid=entry.msgid,
+                msgstr=entry.msgstr,
+                flags=list(entry.flags),
+                tcomment=entry.tcomment,
+                comment=entry.comment,
+            )
+        )
+
+    po.save(str(file_path))
+
+
+def get_random_text(rng: random.Random) -> str:
+    length = rng.choice([0, 3, 20, 60, 75, 80, 150, 300])
+    return "".join(rng.choice(TEXT_PARTS) for _ in range(length))
+
+
+def get_random_entries(rng: random.Random) -> list[PoEntry]:
+    return [
+        PoEntry(
+            get_random_text(rng) or "x",
+            rng.choice(["", get_random_text(rng)]),
+            rng.choice([[], [str(rng.randrange(4))], ["fuzzy", "2"]]),
+            rng.choice(["", "note", "multi\nline comment " * rng.randrange(1, 12)]),
+            rng.choice(["", "generated comment " * rng.randrange(1, 10)]),
+        )
+        for _ in range(rng.randrange(6))
+    ]
+
+
+@pytest.mark.parametrize("entry", ENTRIES, ids=range(len(ENTRIES)))
+def test_save_matches_polib(tmp_path, entry):
+    save_po_file(tmp_path / "native.po", [entry])
+    save_with_polib(tmp_path / "polib.po", [entry])
+
+    assert (tmp_path / "native.po").read_bytes() == (tmp_path / "polib.po").read_bytes()
+
+
+def test_load_matches_polib(tmp_path):
+    save_with_polib(tmp_path / "polib.po", ENTRIES)
+
+    entries = load_po_file(tmp_path / "polib.po")
+
+    assert all(isinstance(entry, PoEntry) for entry in entries)
+    assert to_tuples(entries) == to_tuples(polib.pofile(str(tmp_path / "polib.po")))
+    assert to_tuples(entries) == to_tuples(ENTRIES)
+
+
+def test_random_entries_match_polib(tmp_path):
+    rng = random.Random(0)
+
+    for _ in range(300):
+        entries = get_random_entries(rng)
+
+        save_po_file(tmp_path / "native.po", entries)
+        save_with_polib(tmp_path / "polib.po", entries)
+
+        native_text = (tmp_path / "native.po").read_bytes()
+        assert native_text == (tmp_path / "polib.po").read_bytes()
+
+        parsed_entries = parse_po_entries(native_text.decode("utf-8"))
+        assert parsed_entries is not None
+        assert to_tuples(parsed_entries) == to_tuples(
+            polib.pofile(str(tmp_path / "native.po"))
+        )
+
+
+def test_load_with_bom(tmp_path):
+    save_with_polib(tmp_path / "polib.po", ENTRIES)
+    (tmp_path / "bom.po").write_bytes(
+        b"\xef\xbb\xbf" + (tmp_path / "polib.po").read_bytes()
+    )
+
+    entries = load_po_file(tmp_path / "bom.po")
+
+    assert all(isinstance(entry, PoEntry) for entry in entries)
+    assert to_tuples(entries) == to_tuples(polib.pofile(str(tmp_path / "bom.po")))
+
+
+def test_load_hand_edited_lines(tmp_path):
+    text = "\n".join(
+        [
+            "# header comment",
+            'msgid ""',
+            'msgstr ""',
+            "",
+            "#, 1",
+            '  msgid  "spaced"  ',
+            'msgstr ""',
+            '"continued \\"quoted\\""',
+            "",
+            "## double hash",
+            "#. generated",
+            "#, fuzzy, 2",
+            'msgid "\\n\\t\\\\"',
+            'msgstr "x"',
+        ]
+    )
+    (tmp_path / "edited.po").write_text(text, encoding="utf-8")
+
+    entries = load_po_file(tmp_path / "edited.po")
+
+    assert all(isinstance(entry, PoEntry) for entry in entries)
+    assert to_tuples(entries) == to_tuples(polib.pofile(str(tmp_path / "edited.po")))
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        'msgctxt "context"\nmsgid "a"\nmsgstr "b"\n',
+        '#: source.c:1\nmsgid "a"\nmsgstr "b"\n',
+        '#~ msgid "obsolete"\n#~ msgstr "b"\n',
+        'msgid "a"\nmsgid_plural "as"\nmsgstr[0] "b"\nmsgstr[1] "bs"\n',
+        'msgid ""\nmsgstr "Content-Type: text/plain; charset=UTF-8\\n"\n\nmsgid "a"\nmsgstr "b"\n',
+    ],
+    ids=["msgctxt", "occurrences", "obsolete", "plural", "charset"],
+)
+def test_load_falls_back_to_polib(tmp_path, text):
+    (tmp_path / "other.po").write_text(text, encoding="utf-8")
+
+    po = load_po_file(tmp_path / "other.po")
+
+    assert isinstance(po, polib.POFile)
+
+
+def test_save_falls_back_to_polib(tmp_path):
+    entries = [
+        PoEntry("plain", "", ["0"]),
+        polib.POEntry(msgid="with context", msgstr="", msgctxt="menu"),
+    ]
+
+    save_po_file(tmp_path / "native.po", entries)
+
+    po = polib.pofile(str(tmp_path / "native.po"))
+    assert [(entry.msgid, entry.msgctxt) for entry in po] == [
+        ("plain", None),
+        ("with context", "menu"),
+    ]
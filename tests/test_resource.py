@@ -0,0 +1,103 @@
+from pathlib import Path
+
+from mgtools.cache import BuildCache
+from mgtools.enumerators.file_type import FileType
+from mgtools.profiler import Profiler
+from mgtools.resource import Resource
+
+
+def read_files(folder: Path) -> dict[str, bytes]:
+    return {
+        path.relative_to(folder).as_posix(): path.read_bytes()
+        for path in sorted(folder.rglob("*"))
+        if path.is_file()
+    }
+
+
+def test_parallel_export_matches_serial(resource_path, tmp_path):
+    resource = Resource.from_file(resource_path)
+
+    resource.export_all(tmp_path / "serial", jobs=1)
+    resource.export_all(tmp_path / "parallel", jobs=2)
+
+    assert read_files(tmp_path / "parallel") == read_files(tmp_path / "serial")
+
+
+def test_parallel_export_uses_modified_palette(resource_path, tmp_path):
+    resource = Resource.from_file(resource_path)
+    resource.export_all(tmp_path / "original", jobs=1)
+
+    resource.get_file(74).set_color(0, 1, 2, 3)
+    resource.export_all(tmp_path / "serial", jobs=1)
+    resource.export_all(tmp_path / "parallel", jobs=2)
+
+    serial_files = read_files(tmp_path / "serial")
+    assert read_files(tmp_path / "parallel") == serial_files
+    assert serial_files != read_files(tmp_path / "original")
+
+
+def test_profiler_stages(resource_path, tmp_path):
+    resource = Resource.from_file(resource_path)
+    export_profiler = Profiler()
+    resource.set_profiler(export_profiler)
+    resource.export_all(tmp_path / "export")
+
+    generate_profiler = Profiler()
+    Resource.from_folder(
+        tmp_path / "export",
+        resource.game,
+        resource.platform,
+        profiler=generate_profiler,
+    )
+
+    # Lazy page decoding and packing while loading are timed in their own stage
+    for profiler in (export_profiler, generate_profiler):
+        profiler.stop()
+        font_stats = profiler.get_totals()[FileType.FONT]
+        assert font_stats.decode_time > 0
+        assert font_stats.encode_time > 0
+
+
+def test_dedup_glyphs_verify(resource_path, tmp_path):
+    resource = Resource.from_file(resource_path)
+    resource.export_all(tmp_path / "export", separate_chars=True)
+
+    glyphs_dir = tmp_path / "export" / "font" / "0"
+    for glyph_index in range(40, 45):
+        (glyphs_dir / f"{glyph_index:03d}.png").write_bytes(
+            (glyphs_dir / "033.png").read_bytes()
+        )
+
+    generated = Resource.from_bytes(
+        Resource.from_folder(
+            tmp_path / "export", resource.game, resource.platform, dedup_glyphs=True
+        ).to_bytes()
+    )
+    font = generated.load_from_folder(tmp_path / "export", 75, dedup_glyphs=True)
+
+    assert font.get_dedup_savings()[0][0] == 5
+    assert generated.verify_chunk(75) is not None
+    assert generated.verify_chunk(75, dedup_glyphs=True) is None
+
+
+def test_cache_invalidates_only_readers_using_option(resource_path, tmp_path):
+    resource = Resource.from_file(resource_path)
+    resource.export_all(tmp_path / "export")
+    cache = BuildCache.for_folder(tmp_path / "export")
+
+    Resource.from_folder(
+        tmp_path / "export", resource.game, resource.platform, cache=cache
+    )
+
+    profiler = Profiler()
+    Resource.from_folder(
+        tmp_path / "export",
+        resource.game,
+        resource.platform,
+        cache=cache,
+        profiler=profiler,
+        dedup_glyphs=True,
+    )
+    profiler.stop()
+
+    assert [stats.index for stats in profiler.stats if not stats.cached] == [75]